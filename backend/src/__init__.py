@@ -4,12 +4,13 @@ A real-time fire detection and notification system using computer vision.
 """
 
 from .config import Config, setup_logging
-from .fire_detector import Detector
+from .fire_detector import Detector, Detection
 from .notification_service import NotificationService
 
 __all__ = [
     'Config',
     'setup_logging',
     'Detector',
+    'Detection',
     'NotificationService',
 ]
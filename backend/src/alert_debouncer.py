@@ -0,0 +1,98 @@
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+import numpy as np
+
+
+class PendingAlert(NamedTuple):
+    """Best evidence collected for one coalesced alert."""
+    detection: str
+    confidence: float
+    frame: np.ndarray
+    boxes: Optional[list] = None
+
+
+class AlertDebouncer:
+    """
+    Turns per-frame detections into at most one external alert per incident.
+
+    A hazard must be seen on confirm_frames of the last window_frames
+    inferred frames before it counts. Detections over the next
+    coalesce_seconds are merged into a single alert carrying the frame with
+    the highest confidence, and no further alert is raised until
+    cooldown_seconds after it was sent.
+    """
+
+    def __init__(
+        self,
+        confirm_frames: int = 3,
+        window_frames: int = 5,
+        coalesce_seconds: float = 3.0,
+        cooldown_seconds: float = 60.0
+        ):
+        """
+        Args:
+            confirm_frames (int): Positive frames needed within the window (N of M)
+            window_frames (int): Number of most recent inferred frames considered
+            coalesce_seconds (float): How long a confirmed burst is collected before sending
+            cooldown_seconds (float): Minimum time between two alerts
+        """
+        self.confirm_frames = confirm_frames
+        self.cooldown_seconds = cooldown_seconds
+        self.coalesce_seconds = coalesce_seconds
+
+        # State
+        self._window = deque(maxlen=max(window_frames, confirm_frames))
+        self._pending = None
+        self._pending_since = 0.0
+        self._last_sent = float("-inf")
+
+        # Stats
+        self.alerts_sent = 0
+        self.frames_suppressed = 0
+
+    def update(self, detection: Optional[str], confidence: float, frame: np.ndarray,
+               inferred: bool = True, boxes: Optional[list] = None) -> Optional[PendingAlert]:
+        """
+        Feed one frame's result.
+
+        Args:
+            detection (str): "Fire", "Smoke" or None
+            confidence (float): Highest detection confidence in the frame
+            frame (np.ndarray): Frame to attach if this becomes the best evidence
+            inferred (bool): False when the result was re-used from an earlier frame;
+                such frames don't count towards confirmation
+            boxes (list): Detections to draw on frame when the alert is sent, if it is raw
+
+        Returns:
+            PendingAlert: The coalesced alert once it is due, otherwise None
+        """
+        now = time.monotonic()
+        if inferred:
+            self._window.append(detection is not None)
+
+        if detection is not None:
+            if self._pending is not None:
+                # Keep collecting the burst; remember only the strongest frame
+                if confidence > self._pending.confidence:
+                    self._pending = PendingAlert(detection, confidence, frame.copy(), boxes)
+            elif sum(self._window) >= self.confirm_frames:
+                if now - self._last_sent >= self.cooldown_seconds:
+                    self._pending = PendingAlert(detection, confidence, frame.copy(), boxes)
+                    self._pending_since = now
+                else:
+                    self.frames_suppressed += 1
+
+        if self._pending is not None and now - self._pending_since >= self.coalesce_seconds:
+            alert, self._pending = self._pending, None
+            self._last_sent = now
+            self.alerts_sent += 1
+            return alert
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "sent": self.alerts_sent,
+            "suppressed_frames": self.frames_suppressed,
+            "collecting": self._pending is not None,
+        }
@@ -0,0 +1,172 @@
+import logging
+import sqlite3
+import time
+from eventlet import patcher
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+# Native lock: the outbox is shared by the detection loop and the notification thread
+threading = patcher.original('threading')
+
+
+class Delivery(NamedTuple):
+    """One alert to be sent on one channel."""
+    alert_id: int
+    channel: str
+    attempts: int
+    priority: int
+    detection: str
+    image_path: str
+    progress: Optional[str]
+
+
+class AlertOutbox:
+    """
+    Durable store of alerts and their per-channel delivery state.
+
+    Backed by SQLite in WAL mode, so enqueueing is a single short local
+    transaction and survives a crash or restart. Each delivery moves from
+    pending to sending (claimed by the dispatcher) to sent, or back to
+    pending with a later next_attempt_at after a failure, until it runs
+    out of attempts and is marked failed. A channel with several recipients
+    can store opaque progress with a failure (e.g. who is still unreached),
+    so the retry only goes to those.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS alerts (
+            id INTEGER PRIMARY KEY,
+            created_at REAL NOT NULL,
+            priority INTEGER NOT NULL,
+            detection TEXT NOT NULL,
+            image_path TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS deliveries (
+            alert_id INTEGER NOT NULL REFERENCES alerts(id) ON DELETE CASCADE,
+            channel TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at REAL NOT NULL,
+            last_error TEXT,
+            progress TEXT,
+            PRIMARY KEY (alert_id, channel)
+        );
+        CREATE INDEX IF NOT EXISTS deliveries_due ON deliveries (status, next_attempt_at);
+    """
+
+    def __init__(self, path, max_attempts: int = 20):
+        """
+        Args:
+            path: SQLite database file
+            max_attempts (int): Attempts per channel before a delivery is marked failed
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # NORMAL in WAL mode survives process crashes; only an OS crash can lose the last commits
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(self.SCHEMA)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(deliveries)")]
+        if "progress" not in columns:
+            # Outboxes created before per-recipient progress was tracked
+            self._db.execute("ALTER TABLE deliveries ADD COLUMN progress TEXT")
+
+    def enqueue(self, priority: int, image_path, detection: str, channels: List[str]) -> int:
+        """Record an alert with one pending delivery per channel and return its id."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                alert_id = self._db.execute(
+                    "INSERT INTO alerts (created_at, priority, detection, image_path) VALUES (?, ?, ?, ?)",
+                    (now, priority, detection, str(image_path))).lastrowid
+                self._db.executemany(
+                    "INSERT INTO deliveries (alert_id, channel, next_attempt_at) VALUES (?, ?, ?)",
+                    [(alert_id, channel, now) for channel in channels])
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return alert_id
+
+    def recover(self) -> int:
+        """Return deliveries that were being sent when the process died to pending."""
+        with self._lock:
+            recovered = self._db.execute(
+                "UPDATE deliveries SET status = 'pending' WHERE status = 'sending'").rowcount
+        if recovered:
+            self.logger.info(f"📮 Recovered {recovered} interrupted alert deliveries")
+        return recovered
+
+    def claim_next(self, now: float) -> Optional[Delivery]:
+        """Mark the most urgent due delivery as sending and return it, or None."""
+        with self._lock:
+            row = self._db.execute(
+                """SELECT d.alert_id, d.channel, d.attempts, a.priority, a.detection, a.image_path, d.progress
+                   FROM deliveries d JOIN alerts a ON a.id = d.alert_id
+                   WHERE d.status = 'pending' AND d.next_attempt_at <= ?
+                   ORDER BY a.priority, d.alert_id LIMIT 1""", (now,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE deliveries SET status = 'sending' WHERE alert_id = ? AND channel = ?", row[:2])
+        return Delivery(*row)
+
+    def next_attempt_at(self) -> Optional[float]:
+        """Earliest time a pending delivery becomes due, or None if there are none."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT MIN(next_attempt_at) FROM deliveries WHERE status = 'pending'").fetchone()[0]
+
+    def mark_sent(self, delivery: Delivery) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE deliveries SET status = 'sent', attempts = attempts + 1, last_error = NULL "
+                "WHERE alert_id = ? AND channel = ?", (delivery.alert_id, delivery.channel))
+
+    def mark_failed(self, delivery: Delivery, error: str, retry_at: float, progress: Optional[str] = None) -> bool:
+        """
+        Record a failed attempt.
+
+        Args:
+            delivery (Delivery): The claimed delivery
+            error (str): Reason, kept for inspection
+            retry_at (float): When to try again
+            progress (str): Channel state for the retry (None keeps the previous one)
+
+        Returns:
+            bool: True if the delivery will be retried at retry_at, False if it gave up
+        """
+        attempts = delivery.attempts + 1
+        retry = attempts < self.max_attempts
+        with self._lock:
+            self._db.execute(
+                "UPDATE deliveries SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?, "
+                "progress = COALESCE(?, progress) WHERE alert_id = ? AND channel = ?",
+                ('pending' if retry else 'failed', attempts, retry_at, error, progress,
+                 delivery.alert_id, delivery.channel))
+        return retry
+
+    def prune(self, older_than: float) -> int:
+        """Delete alerts created before older_than whose deliveries have all finished."""
+        with self._lock:
+            return self._db.execute(
+                """DELETE FROM alerts WHERE created_at < ? AND NOT EXISTS (
+                       SELECT 1 FROM deliveries d
+                       WHERE d.alert_id = alerts.id AND d.status IN ('pending', 'sending'))""",
+                (older_than,)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM deliveries GROUP BY status"))
+        return {status: counts.get(status, 0) for status in ('pending', 'sending', 'sent', 'failed')}
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -5,15 +5,17 @@ import sys
 import os
 import atexit
 import logging
-from flask import Flask, Response, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory
 from flask_socketio import SocketIO
 
 # --- Config & Logging ---
 from .config import Config, setup_logging
 
 # --- Custom Managers ---
-from .fire_manager import FireManager
+from .fire_manager import FireManager, create_detector
 from .face_manager import FaceManager
+from .micro_batcher import MicroBatcher
+from .notification_service import NotificationService
 
 # --- Server Setup ---
 app = Flask(__name__)
@@ -32,8 +34,33 @@ logger.info("🚀 Starting Fire Detection System (Web Server Mode)")
 # We create instances of our managers, passing the socketio instance
 # so they can emit events directly.
 try:
-    fire_manager = FireManager(socketio, Config.MODEL_PATH, camera_index=0)
-    face_manager = FaceManager(socketio, images_path, camera_index=1)
+    # External notifications are optional; the web UI works without them
+    notifier = None
+    try:
+        notifier = NotificationService(Config)
+    except Exception as e:
+        logger.error(f"Notification service unavailable: {e}")
+
+    # Several in-process fire cameras share one model through a micro-batcher
+    batcher = None
+    if len(Config.FIRE_CAMERA_INDICES) > 1 and not Config.CAMERA_PROCESS_MODE:
+        batcher = MicroBatcher(create_detector(Config.MODEL_PATH),
+                               max_batch_size=Config.FIRE_BATCH_SIZE,
+                               max_wait_ms=Config.FIRE_BATCH_WAIT_MS)
+
+    fire_managers = [
+        FireManager(socketio, Config.MODEL_PATH, camera_index=index,
+                    use_process=Config.CAMERA_PROCESS_MODE, batcher=batcher, notifier=notifier)
+        for index in Config.FIRE_CAMERA_INDICES
+    ]
+    fire_manager = fire_managers[0]
+    face_manager = FaceManager(socketio, images_path, camera_index=Config.CCTV_CAMERA_INDEX,
+                               use_process=Config.CAMERA_PROCESS_MODE)
+
+    # One producer per camera; every viewer shares its output
+    for manager in fire_managers:
+        manager.start()
+    face_manager.start()
 except Exception as e:
     logger.critical(f"Critical initialization error: {e}")
     sys.exit(1)
@@ -42,8 +69,11 @@ except Exception as e:
 @atexit.register
 def cleanup():
     logger.info("Shutting down managers...")
-    fire_manager.release()
+    for manager in fire_managers:
+        manager.release()
     face_manager.release()
+    if notifier:
+        notifier.cleanup()
     logger.info("Cleanup complete.")
 
 # --- Web Routes ---
@@ -56,18 +86,46 @@ def static_files(path):
     return send_from_directory(root_dir, path)
 
 # --- Video Feed Routes ---
+def stream_variant():
+    """Read ?width=&quality= (so small dashboards can ask for a lighter stream) and identify the viewer."""
+    width = request.args.get('width', type=int)
+    quality = request.args.get('quality', type=int)
+    if width is not None:
+        width = max(64, width)
+    if quality is not None:
+        quality = min(max(quality, 10), 100)
+    client_id = f"{request.remote_addr}:{request.environ.get('REMOTE_PORT', '?')}"
+    return width, quality, client_id
+
 @app.route('/fire_video_feed')
 def fire_video_feed():
     """Fire detection video streaming route."""
-    return Response(fire_manager.generate_frames(),
+    return Response(fire_manager.generate_frames(*stream_variant()),
+                    mimetype='multipart/x-mixed-replace; boundary=frame')
+
+@app.route('/fire_video_feed/<int:camera>')
+def fire_camera_video_feed(camera):
+    """Video streaming route for the n-th fire camera in FIRE_CAMERA_INDICES."""
+    if camera >= len(fire_managers):
+        return Response("Unknown fire camera", status=404)
+    return Response(fire_managers[camera].generate_frames(*stream_variant()),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/cctv_video_feed')
 def cctv_video_feed():
     """CCTV video streaming route."""
-    return Response(face_manager.generate_frames(),
+    return Response(face_manager.generate_frames(*stream_variant()),
                     mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/stats')
+def stats():
+    """Per-camera pacing and capture counters."""
+    return jsonify({
+        'fire': [manager.stats() for manager in fire_managers],
+        'cctv': face_manager.stats(),
+        'notifications': notifier.stats() if notifier else None,
+    })
+
 # --- SocketIO Handlers ---
 @socketio.on('connect')
 def handle_connect():
@@ -88,6 +146,11 @@ def handle_add_new_person(data):
     # Delegate to FaceManager
     face_manager.add_new_person(data)
 
+@socketio.on('remove_person')
+def handle_remove_person(data):
+    # Delegate to FaceManager
+    face_manager.remove_person(data)
+
 # --- Main Runner ---
 if __name__ == "__main__":
     logger.info("Starting Flask-SocketIO server on http://localhost:5000")
@@ -0,0 +1,233 @@
+"""
+Benchmark harness for the detection and recognition hot paths.
+
+Replays a recorded video (Config.VIDEO_SOURCE by default) or synthetic
+frames through each stage without a camera, and prints per-stage latency
+percentiles, FPS and peak RSS as JSON so runs can be compared across
+commits and inference backends. Each frame stage runs in its own process,
+so its peak RSS is not inflated by the stages before it.
+
+Usage (from backend/):
+    python -m src.benchmark --stages detect,encode,mjpeg --frames 300
+    python -m src.benchmark --synthetic --backend onnx --output bench.json
+    python -m src.benchmark --stages index --gallery-size 20000
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+from .config import Config
+
+STAGES = ('detect', 'face', 'encode', 'mjpeg')
+INDEX_STAGE = 'index' # Gallery search; runs on synthetic embeddings, not frames
+
+
+def load_frames(source, count, synthetic=False, width=1280, height=720):
+    """Decode up to count frames from source, or build synthetic ones."""
+    if synthetic:
+        rng = np.random.default_rng(0)
+        base = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        # Shift the pattern each frame so nothing downstream sees a static scene
+        return [np.roll(base, i * 4, axis=1) for i in range(count)]
+
+    cap = cv2.VideoCapture(str(source))
+    frames = []
+    while len(frames) < count:
+        ret, frame = cap.read()
+        if not ret:
+            if not frames:
+                raise FileNotFoundError(f"Could not read frames from {source}")
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)  # Loop short clips
+            continue
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def measure(fn, frames, warmup):
+    """Run fn on every frame and return its latency summary."""
+    for frame in frames[:warmup]:
+        fn(frame)
+
+    latencies = []
+    start = time.perf_counter()
+    for frame in frames:
+        t0 = time.perf_counter()
+        fn(frame)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000.0
+    return {
+        "frames": len(frames),
+        "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies_ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+        "mean_ms": round(float(latencies_ms.mean()), 3),
+        "fps": round(len(frames) / total, 2) if total > 0 else 0.0,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return round(peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def benchmark_index(gallery_size, queries=1000, nprobe=Config.FACE_INDEX_NPROBE):
+    """
+    Compare the approximate face index with exact search on a synthetic gallery.
+
+    Queries are noisy copies of enrolled embeddings, so the exact nearest
+    neighbour is known; recall@1 is the fraction the IVF index also finds.
+    """
+    from .face_index import build_index
+
+    rng = np.random.default_rng(0)
+    # Face embeddings are roughly unit length; identities sit ~1.0 apart, matches within 0.6
+    gallery = rng.normal(size=(gallery_size, 128)).astype(np.float32)
+    gallery /= np.linalg.norm(gallery, axis=1, keepdims=True)
+    targets = rng.integers(0, gallery_size, queries)
+    probes = gallery[targets] + rng.normal(scale=0.03, size=(queries, 128)).astype(np.float32)
+
+    results = {}
+    exact_rows = None
+    for kind in ('exact', 'ivf'):
+        t0 = time.perf_counter()
+        index = build_index(kind, gallery, nprobe=nprobe)
+        build_s = time.perf_counter() - t0
+
+        latencies = []
+        rows = []
+        for probe in probes:
+            t0 = time.perf_counter()
+            row, _ = index.search(probe[None, :])
+            latencies.append(time.perf_counter() - t0)
+            rows.append(row[0])
+        rows = np.array(rows)
+        if exact_rows is None:
+            exact_rows = rows
+
+        latencies_ms = np.array(latencies) * 1000.0
+        results[kind] = {
+            "gallery": gallery_size,
+            "build_s": round(build_s, 3),
+            "p50_ms": round(float(np.percentile(latencies_ms, 50)), 3),
+            "p99_ms": round(float(np.percentile(latencies_ms, 99)), 3),
+            "recall_at_1": round(float((rows == exact_rows).mean()), 4),
+        }
+    results["ivf"]["nprobe"] = nprobe
+    return results
+
+
+def run_stage(name, args):
+    """
+    Load frames, build one stage and measure it. Runs in a fresh process per stage.
+
+    stage_rss_mb is the peak RSS above what the process held before the
+    stage was built (interpreter and frames), i.e. the stage's own footprint.
+    """
+    frames = load_frames(args.source, args.frames, synthetic=args.synthetic)
+    baseline_mb = peak_rss_mb()
+    stage = build_stage(name, args)
+    result = measure(stage, frames, args.warmup)
+    result["stage_rss_mb"] = round(result["peak_rss_mb"] - baseline_mb, 1)
+    return result
+
+
+def build_stage(name, args):
+    """Return a per-frame callable for the named stage."""
+    if name == 'detect':
+        from .fire_detector import Detector
+        from .inference_backend import resolve_model_path
+
+        model_path = resolve_model_path(
+            Config.MODEL_PATH, backend=args.backend, int8=args.int8,
+            cache_dir=Config.EXPORTED_MODELS_DIR)
+        # Raw model cost: no cadence, gating or batching
+        detector = Detector(model_path, iou_threshold=0.20)
+        return detector.process_frame
+
+    if name == 'face':
+        from .face_manager import create_face_recognizer
+
+        # Same detector/encoder settings as the CCTV camera
+        sfr = create_face_recognizer(args.images)
+        return sfr.detect_known_faces
+
+    if name == 'encode':
+        from .jpeg_encoder import JpegEncoder
+
+        encoder = JpegEncoder(args.jpeg_encoder)
+        return lambda frame: encoder.encode(frame, Config.JPEG_QUALITY)
+
+    if name == 'mjpeg':
+        from .frame_broadcaster import FrameBroadcaster
+        from .jpeg_encoder import JpegEncoder
+
+        broadcaster = FrameBroadcaster("Benchmark", JpegEncoder(args.jpeg_encoder))
+        subscriber = broadcaster.subscribe()
+
+        def publish_and_consume(frame):
+            broadcaster.publish(frame)
+            next(subscriber)
+        return publish_and_consume
+
+    raise ValueError(f"Unknown stage: {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SHORTY hot path benchmark")
+    parser.add_argument('--source', default=str(Config.VIDEO_SOURCE), help="Video file to replay")
+    parser.add_argument('--synthetic', action='store_true', help="Use synthetic frames instead of a video")
+    parser.add_argument('--frames', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=10)
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Any of {', '.join(STAGES + (INDEX_STAGE,))}")
+    parser.add_argument('--backend', default=Config.INFERENCE_BACKEND, choices=['pytorch', 'onnx', 'openvino'])
+    parser.add_argument('--int8', action='store_true')
+    parser.add_argument('--jpeg-encoder', default=Config.JPEG_ENCODER,
+                        choices=['auto', 'simplejpeg', 'turbojpeg', 'opencv'])
+    parser.add_argument('--images', default=str(Config.PROJECT_ROOT / 'images'))
+    parser.add_argument('--gallery-size', type=int, default=10000, help="Synthetic gallery size for the index stage")
+    parser.add_argument('--output', help="Write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    stages = [name.strip() for name in args.stages.split(',')]
+    frame_stages = [name for name in stages if name != INDEX_STAGE]
+    # Frames are loaded by each stage's process; one is enough here for the resolution
+    frames = load_frames(args.source, 1, synthetic=args.synthetic) if frame_stages else []
+    report = {
+        "source": "synthetic" if args.synthetic else args.source,
+        "resolution": list(frames[0].shape[:2]) if frames else None,
+        "backend": args.backend,
+        "int8": args.int8,
+        "jpeg_encoder": args.jpeg_encoder,
+        "stages": {},
+    }
+    # ru_maxrss is a process-wide high-water mark, so stages sharing a process
+    # would inherit each other's peaks
+    context = multiprocessing.get_context('spawn')
+    for name in frame_stages:
+        with context.Pool(1) as pool:
+            report["stages"][name] = pool.apply(run_stage, (name, args))
+    if INDEX_STAGE in stages:
+        report["stages"][INDEX_STAGE] = benchmark_index(args.gallery_size)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Process-per-camera pipeline.
+
+The web server starts one worker process per camera with CameraProcess. Each
+worker owns its VideoCapture and model, and hands frames plus detection
+results back through a SharedFrameRing, so full frames are never pickled.
+A worker that dies is respawned on the same ring, with backoff.
+"""
+
+import argparse
+import logging
+import math
+import os
+import subprocess
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import cv2
+
+from .config import Config
+from .shared_frame_ring import SharedFrameRing
+from .frame_grabber import FrameGrabber
+from .frame_scheduler import FrameScheduler
+
+
+class CameraProcess:
+    """Main-process handle for one camera worker process."""
+
+    def __init__(self, kind: str, camera_index: int, source_path):
+        """
+        Args:
+            kind (str): "fire" for YOLO detection, "face" for recognition
+            camera_index (int): OpenCV camera index opened by the worker
+            source_path: Model file (fire) or images folder (face)
+        """
+        self.logger = logging.getLogger(__name__)
+        self.kind = kind
+        self.camera_index = camera_index
+        self.source_path = source_path
+
+        # State
+        self.ring = None
+        self.process = None
+        self.last_sequence = 0
+        self.started_at = 0.0
+        self.restart_delay = Config.CAMERA_PROCESS_RESTART_MIN_S
+        self.next_restart = 0.0
+
+        # Stats
+        self.restarts = 0
+        self.scheduler_stats = {} # The worker's own pacing, reported with every frame
+
+    def start(self):
+        """Create the shared ring and launch the worker process."""
+        self.ring = SharedFrameRing(
+            name=f"shorty_{self.kind}_{uuid.uuid4().hex[:8]}",
+            slots=Config.CAMERA_PROCESS_SLOTS,
+            max_frame_bytes=Config.CAMERA_PROCESS_MAX_FRAME_BYTES,
+            create=True
+        )
+        self._spawn()
+
+    def _spawn(self):
+        command = [
+            sys.executable, '-m', 'src.camera_process',
+            '--kind', self.kind,
+            '--camera-index', str(self.camera_index),
+            '--source', str(self.source_path),
+            '--ring', self.ring.name,
+            '--slots', str(self.ring.slots),
+            '--max-frame-bytes', str(self.ring.max_frame_bytes),
+        ]
+        # A fresh interpreter keeps app.py (and its monkey-patching) out of the worker
+        self.process = subprocess.Popen(command, cwd=str(Config.PROJECT_ROOT))
+        self.started_at = time.monotonic()
+        self.logger.info(f"Started {self.kind} camera process (pid {self.process.pid})")
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def ensure_running(self) -> bool:
+        """
+        Respawn the worker if it died, backing off while it keeps crashing.
+
+        The new worker attaches to the same ring, whose sequence numbers carry on.
+
+        Returns:
+            bool: True if a worker is running (or was just restarted)
+        """
+        if self.is_alive():
+            if time.monotonic() - self.started_at > Config.CAMERA_PROCESS_RESTART_MAX_S:
+                self.restart_delay = Config.CAMERA_PROCESS_RESTART_MIN_S
+            return True
+        if self.ring is None or time.monotonic() < self.next_restart:
+            return False
+
+        self.restarts += 1
+        self.logger.warning(f"{self.kind.capitalize()} camera process exited "
+                            f"(code {self.process.returncode}), restarting (restart {self.restarts})")
+        self._spawn()
+        self.next_restart = time.monotonic() + self.restart_delay
+        self.restart_delay = min(self.restart_delay * 2, Config.CAMERA_PROCESS_RESTART_MAX_S)
+        return True
+
+    def read_latest(self):
+        """Return (frame, result) for the newest unseen frame, or (None, None)."""
+        sequence, frame, result = self.ring.read_latest(self.last_sequence)
+        self.last_sequence = sequence
+        if result is not None:
+            self.scheduler_stats = result.pop("scheduler", self.scheduler_stats)
+        return frame, result
+
+    def stats(self) -> dict:
+        return {"alive": self.is_alive(), "restarts": self.restarts}
+
+    def release(self):
+        if self.process and self.is_alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+        self.logger.info(f"{self.kind.capitalize()} camera process stopped.")
+
+
+def _fit_to_ring(frame, ring):
+    """
+    Downscale a frame that is too large for a ring slot (e.g. a 4K camera).
+
+    Returns:
+        tuple: (frame, scale) where scale is 1.0 if the frame already fits
+    """
+    if frame.nbytes <= ring.max_frame_bytes:
+        return frame, 1.0
+    scale = math.sqrt(ring.max_frame_bytes / frame.nbytes)
+    height, width = frame.shape[:2]
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA), size[0] / width
+
+
+def _run_fire_worker(grabber, ring, model_path, parent_alive):
+    from .fire_manager import create_detector
+
+    detector = create_detector(model_path)
+    scheduler = FrameScheduler(Config.FIRE_TARGET_FPS, Config.MIN_INFERENCE_FPS, sleep=time.sleep)
+    frame_id = 0
+    while parent_alive():
+        frame_id, frame = grabber.read(frame_id)
+        if frame is None:
+            time.sleep(0.005)
+            continue
+
+        infer = scheduler.begin_frame()
+        processed_frame, detection = detector.process_frame(frame, infer)
+        processed_frame, _ = _fit_to_ring(processed_frame, ring)
+        ring.write(processed_frame, {"detection": detection, "confidence": detector.last_confidence,
+                                     "confidences": detector.hazard_confidences,
+                                     "inferred": detector.ran_inference,
+                                     "scheduler": scheduler.stats()})
+        scheduler.end_frame(detector.ran_inference)
+
+
+def _gallery_mtime(images_path):
+    """Latest mtime of the images folder and its per-person subfolders."""
+    folders = [images_path] + [entry.path for entry in os.scandir(images_path) if entry.is_dir()]
+    return max(os.path.getmtime(folder) for folder in folders)
+
+
+def _run_face_worker(grabber, ring, images_path, parent_alive):
+    from .face_manager import create_face_recognizer, create_face_tracker
+
+    sfr = create_face_recognizer(images_path)
+    tracker = create_face_tracker(sfr)
+    recognize = tracker.update if tracker else sfr.detect_known_faces
+    images_mtime = _gallery_mtime(images_path)
+    next_gallery_check = time.monotonic() + Config.GALLERY_CHECK_INTERVAL_S
+
+    scheduler = FrameScheduler(Config.CCTV_TARGET_FPS, Config.MIN_INFERENCE_FPS, sleep=time.sleep)
+    face_locations, face_names = [], []
+    resize_tuned = not Config.CCTV_FACE_AUTO_RESIZE
+    frame_id = 0
+    while parent_alive():
+        # Pick up people enrolled through the web server; scanning every person
+        # folder is too costly to do per frame on large galleries
+        if time.monotonic() >= next_gallery_check:
+            next_gallery_check = time.monotonic() + Config.GALLERY_CHECK_INTERVAL_S
+            mtime = _gallery_mtime(images_path)
+            if mtime != images_mtime:
+                sfr.load_encoding_images(images_path)
+                if tracker:
+                    tracker.reset()
+                images_mtime = mtime
+
+        frame_id, frame = grabber.read(frame_id)
+        if frame is None:
+            time.sleep(0.005)
+            continue
+
+        # Size the detection resize to this machine once, on a real frame
+        if not resize_tuned:
+            resize_tuned = True
+            sfr.auto_tune_resize(frame, Config.CCTV_FACE_AUTO_RESIZE_FPS)
+
+        # Skipped frames repeat the last recognition result
+        infer = scheduler.begin_frame()
+        if infer:
+            locations, face_names = recognize(frame)
+            face_locations = locations.tolist()
+
+        # Recognition runs on the full frame; only what is shared gets downscaled
+        shared_frame, scale = _fit_to_ring(frame, ring)
+        shared_locations = face_locations if scale == 1.0 else \
+            [[int(v * scale) for v in location] for location in face_locations]
+        ring.write(shared_frame, {"locations": shared_locations, "names": face_names,
+                                  "scheduler": scheduler.stats()})
+        scheduler.end_frame(infer)
+
+
+def main():
+    import cv2
+    from .config import setup_logging
+
+    parser = argparse.ArgumentParser(description="SHORTY camera worker process")
+    parser.add_argument('--kind', choices=['fire', 'face'], required=True)
+    parser.add_argument('--camera-index', type=int, required=True)
+    parser.add_argument('--source', required=True)
+    parser.add_argument('--ring', required=True)
+    parser.add_argument('--slots', type=int, required=True)
+    parser.add_argument('--max-frame-bytes', type=int, required=True)
+    args = parser.parse_args()
+
+    setup_logging()
+    logger = logging.getLogger(__name__)
+
+    parent_pid = os.getppid()
+    parent_alive = lambda: os.getppid() == parent_pid
+
+    ring = SharedFrameRing(name=args.ring, slots=args.slots, max_frame_bytes=args.max_frame_bytes)
+    cap = cv2.VideoCapture(args.camera_index)
+    if not cap.isOpened():
+        logger.error(f"Failed to open camera source: {args.camera_index}")
+    grabber = FrameGrabber(cap, f"{args.kind} worker")
+    grabber.start()
+
+    try:
+        if args.kind == 'fire':
+            _run_fire_worker(grabber, ring, Path(args.source), parent_alive)
+        else:
+            _run_face_worker(grabber, ring, args.source, parent_alive)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        grabber.stop()
+        cap.release()
+        ring.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -39,7 +39,89 @@ class Config:
     VIDEO_SOURCE = PROJECT_ROOT / 'data' / 'police_car_fire_ccvt.mp4'
     DETECTED_FIRES_DIR = PROJECT_ROOT / 'detected_fires'
 
-    ALERT_COOLDOWN = 0 # Seconds between alerts
+    # Inference runtime: pytorch, onnx (ONNX Runtime) or openvino
+    INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'pytorch').lower()
+    INFERENCE_INT8 = os.getenv('INFERENCE_INT8', 'false').lower() == 'true' # OpenVINO only
+    INFERENCE_INT8_DATA = os.getenv('INFERENCE_INT8_DATA', '') # Calibration dataset yaml
+    EXPORTED_MODELS_DIR = PROJECT_ROOT / 'models' / 'exported'
+
+    ALERT_COOLDOWN = 60 # Seconds between external notifications per camera
+    FIRE_ALERT_CONFIRM_FRAMES = 3 # A hazard must be seen on N ...
+    FIRE_ALERT_WINDOW_FRAMES = 5 # ... of the last M inferred frames before notifying
+    FIRE_ALERT_COALESCE_S = 3.0 # A confirmed burst is collected this long; its best frame is sent
+    # Web UI hazard state: EMA of per-class confidence, counting only boxes that pass the
+    # detector's thresholds (Fire 0.5, Smoke 0.75) and 0 otherwise, so these sit lower
+    # to tolerate missed frames
+    HAZARD_SMOOTHING_S = 0.5 # EMA time constant
+    HAZARD_RAISE_CONFIDENCE = {'Fire': 0.35, 'Smoke': 0.5}
+    HAZARD_CLEAR_CONFIDENCE = {'Fire': 0.15, 'Smoke': 0.2}
+    HAZARD_RAISE_HOLD_S = 0.5 # Smoothed confidence must stay above the raise threshold this long
+    HAZARD_CLEAR_HOLD_S = 5.0 # ... and below the clear threshold this long before clearing
+
+    TELEGRAM_MAX_CONCURRENT_SENDS = 8 # Parallel sends (and pooled connections) per alert
+    NOTIFICATION_MAX_CONCURRENT = 4 # Channel deliveries sent at the same time
+    NOTIFICATION_OUTBOX_PATH = PROJECT_ROOT / 'outbox' / 'alerts.db' # Survives restarts
+    NOTIFICATION_MAX_ATTEMPTS = 20 # Per channel, then the delivery is marked failed
+    NOTIFICATION_RETRY_BASE_S = 5 # First retry delay, doubled per attempt
+    NOTIFICATION_RETRY_MAX_S = 300
+    NOTIFICATION_OUTBOX_RETENTION_DAYS = 7 # Finished alerts are pruned after this
+
+    # Frame pacing (per camera)
+    FIRE_TARGET_FPS = 30
+    CCTV_TARGET_FPS = 30
+    MIN_INFERENCE_FPS = 2 # Inference is never degraded below this rate
+
+    # Face encodings are cached here (kept outside images/, which is globbed for enrollment photos)
+    FACE_ENCODING_CACHE_DIR = PROJECT_ROOT / 'face_encodings'
+    GALLERY_CHECK_INTERVAL_S = 1.0 # Process mode: how often the face worker looks for gallery changes
+
+    # Face recognition for the CCTV camera
+    CCTV_FACE_DETECTION_MODEL = os.getenv('CCTV_FACE_DETECTION_MODEL', 'hog') # hog (CPU) or cnn (needs dlib CUDA)
+    CCTV_FACE_UPSAMPLE = 1 # Upsampling passes; finds smaller faces, slower
+    CCTV_FACE_RESIZE = 0.25 # Frame scale used for detection and encoding
+    CCTV_FACE_NUM_JITTERS = 1 # Re-samples per live face encoding
+    CCTV_FACE_AUTO_RESIZE = os.getenv('CCTV_FACE_AUTO_RESIZE', 'false').lower() == 'true'
+    CCTV_FACE_AUTO_RESIZE_FPS = 10 # Auto-resize picks the largest scale recognizing at this rate
+    FACE_ENCODING_MODEL = 'small' # small (5 landmarks) or large (68); applies to enrollment and live
+    FACE_ENROLL_NUM_JITTERS = 1 # Re-samples per enrollment image (higher = more robust, slower)
+
+    # Face gallery search: "exact" brute force, or "ivf" approximate search for thousands of people
+    FACE_INDEX = os.getenv('FACE_INDEX', 'exact')
+    FACE_INDEX_NPROBE = 8 # IVF buckets scanned per face (higher = better recall, slower)
+
+    # Face tracking: encode faces only when new or every N frames
+    FACE_TRACKING = True
+    FACE_TRACK_IOU = 0.3 # Minimum overlap to continue a track
+    FACE_REENCODE_EVERY = 15 # Re-check a tracked face's identity after N frames
+    FACE_TRACK_MAX_MISSES = 5 # Frames a face may go undetected before its track ends
+
+    # MJPEG encoding; viewers may request smaller/lower-quality variants
+    JPEG_ENCODER = os.getenv('JPEG_ENCODER', 'auto') # auto, simplejpeg, turbojpeg or opencv
+    JPEG_QUALITY = 95 # Default quality (OpenCV's default)
+    STREAM_SEND_TIMEOUT = 10 # Seconds a stalled viewer may block one frame write
+
+    # Fire inference cadence; boxes are re-drawn on frames in between
+    FIRE_INFER_EVERY_N = 1 # Run YOLO at most every N frames
+    FIRE_INFER_INTERVAL_MS = 100 # ...and at most every T ms (~10 Hz)
+    FIRE_BOX_PROPAGATION = False # Shift re-used boxes with optical flow
+
+    # Motion gating: skip YOLO while the fire camera sees a static scene
+    FIRE_MOTION_GATING = True
+    FIRE_MOTION_CHANGED_FRACTION = 0.005 # Share of changed pixels that opens the gate
+    FIRE_FORCED_INFERENCE_S = 2.0 # Still infer at least this often on static scenes
+
+    # Fire cameras; with more than one, their frames share batched YOLO calls
+    FIRE_CAMERA_INDICES = [int(i) for i in os.getenv('FIRE_CAMERA_INDICES', '0').split(',')]
+    CCTV_CAMERA_INDEX = int(os.getenv('CCTV_CAMERA_INDEX', '1'))
+    FIRE_BATCH_SIZE = 4 # Max frames per batched YOLO call
+    FIRE_BATCH_WAIT_MS = 10 # Max time to wait for a batch to fill
+
+    # Run each camera's capture+inference loop in its own process
+    CAMERA_PROCESS_MODE = os.getenv('CAMERA_PROCESS_MODE', 'false').lower() == 'true'
+    CAMERA_PROCESS_SLOTS = 3 # Frames held in each shared-memory ring
+    CAMERA_PROCESS_MAX_FRAME_BYTES = 1920 * 1080 * 3 # Largest frame a ring slot can hold (larger ones are downscaled)
+    CAMERA_PROCESS_RESTART_MIN_S = 1 # Delay before respawning a crashed worker, doubled per crash ...
+    CAMERA_PROCESS_RESTART_MAX_S = 60 # ... up to this; a worker that stays up this long resets it
 
     @classmethod
     def validate(cls):
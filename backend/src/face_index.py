@@ -0,0 +1,190 @@
+import logging
+import os
+import numpy as np
+from typing import Optional, Tuple
+
+
+def _squared_norms(matrix: np.ndarray) -> np.ndarray:
+    return np.einsum("ij,ij->i", matrix, matrix)
+
+
+def _exact_search(matrix: np.ndarray, norms: np.ndarray, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # |a|^2 + |b|^2 - 2ab for every (query, row) pair at once
+    distances = _squared_norms(queries)[:, None] + norms[None, :] - 2.0 * (queries @ matrix.T)
+    rows = distances.argmin(axis=1)
+    return rows, distances[np.arange(len(queries)), rows]
+
+
+class ExactIndex:
+    """
+    Brute-force nearest-neighbour search over the whole face gallery.
+
+    Every query is compared with every row in one matrix product, so
+    results are exact; cost grows linearly with gallery size.
+    """
+
+    kind = "exact"
+
+    def __init__(self, matrix: np.ndarray):
+        """
+        Args:
+            matrix (np.ndarray): Contiguous float32 gallery, one 128-d embedding per row
+        """
+        self.matrix = matrix
+        self.norms = _squared_norms(matrix)
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the nearest gallery row for each query.
+
+        Args:
+            queries (np.ndarray): float32 array of shape (faces, 128)
+
+        Returns:
+            tuple: (row indices, squared distances), one per query
+        """
+        return _exact_search(self.matrix, self.norms, queries)
+
+
+class IvfIndex:
+    """
+    Inverted-file approximate search for large face galleries.
+
+    Rows are bucketed under k-means centroids and a query scans only the
+    nprobe closest buckets. Centroids are trained once and persisted; new
+    enrollments are assigned to existing buckets, so rebuilding a snapshot
+    after add/remove costs one rows x centroids product instead of a retrain.
+    Galleries smaller than min_train_size are searched exactly.
+    """
+
+    kind = "ivf"
+    STATE_FILE = "ivf_centroids.npz"
+
+    def __init__(self, matrix: np.ndarray, centroids: Optional[np.ndarray] = None, trained_size: int = 0,
+                 nprobe: int = 8, min_train_size: int = 1024):
+        """
+        Args:
+            matrix (np.ndarray): Contiguous float32 gallery, one 128-d embedding per row
+            centroids (np.ndarray): Previously trained centroids to reuse, if any
+            trained_size (int): Gallery size the centroids were trained on
+            nprobe (int): Buckets scanned per query (higher = better recall, slower)
+            min_train_size (int): Below this many rows the index falls back to exact search
+        """
+        self.logger = logging.getLogger(__name__)
+        self.matrix = matrix
+        self.norms = _squared_norms(matrix)
+        self.nprobe = nprobe
+        self.centroids = None
+        self.trained_size = 0
+        self.retrained = False
+
+        if len(matrix) < min_train_size:
+            return
+
+        # Retrain only when the gallery has grown or shrunk a lot since the last training
+        if centroids is None or not trained_size / 2 <= len(matrix) <= trained_size * 2:
+            centroids = self._train(matrix)
+            trained_size = len(matrix)
+            self.retrained = True
+        self.centroids = centroids
+        self.trained_size = trained_size
+
+        # Bucket rows: order holds row ids grouped by centroid, offsets delimit each bucket
+        assignments = self._nearest_centroids(matrix, 1)[:, 0]
+        self.order = np.argsort(assignments, kind="stable")
+        self.offsets = np.searchsorted(assignments[self.order], np.arange(len(centroids) + 1))
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def search(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Same contract as ExactIndex.search, scanning only the nearest buckets."""
+        if self.centroids is None:
+            return _exact_search(self.matrix, self.norms, queries)
+
+        rows = np.empty(len(queries), dtype=np.int64)
+        best = np.empty(len(queries), dtype=np.float32)
+        for i, (query, probes) in enumerate(zip(queries, self._nearest_centroids(queries, self.nprobe))):
+            candidates = np.concatenate([self.order[self.offsets[c]:self.offsets[c + 1]] for c in probes])
+            if len(candidates) == 0:
+                candidates = np.arange(len(self.matrix))
+            distances = self.norms[candidates] - 2.0 * (self.matrix[candidates] @ query) + query @ query
+            nearest = distances.argmin()
+            rows[i], best[i] = candidates[nearest], distances[nearest]
+        return rows, best
+
+    def save_state(self, state_dir) -> None:
+        """Persist the trained centroids (written to a temp file, then renamed)."""
+        if self.centroids is None:
+            return
+        os.makedirs(state_dir, exist_ok=True)
+        tmp_path = os.path.join(state_dir, self.STATE_FILE + ".tmp.npz")
+        np.savez(tmp_path, centroids=self.centroids, trained_size=self.trained_size)
+        os.replace(tmp_path, os.path.join(state_dir, self.STATE_FILE))
+
+    @classmethod
+    def load_state(cls, state_dir) -> Tuple[Optional[np.ndarray], int]:
+        try:
+            with np.load(os.path.join(state_dir, cls.STATE_FILE)) as state:
+                return state["centroids"], int(state["trained_size"])
+        except (FileNotFoundError, KeyError, ValueError):
+            return None, 0
+
+    def _nearest_centroids(self, vectors: np.ndarray, count: int) -> np.ndarray:
+        distances = _squared_norms(self.centroids)[None, :] - 2.0 * (vectors @ self.centroids.T)
+        count = min(count, len(self.centroids))
+        nearest = np.argpartition(distances, count - 1, axis=1)[:, :count]
+        return nearest
+
+    def _train(self, matrix: np.ndarray, iterations: int = 10) -> np.ndarray:
+        """Lloyd's k-means on a sample of the gallery, about 4 * sqrt(N) centroids."""
+        rng = np.random.default_rng(0)
+        nlist = max(1, int(4 * np.sqrt(len(matrix))))
+        sample = matrix[rng.choice(len(matrix), min(len(matrix), nlist * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), nlist, replace=False)].copy()
+
+        self.logger.info(f"Training IVF face index: {nlist} buckets on {len(sample)} of {len(matrix)} faces")
+        for _ in range(iterations):
+            self.centroids = centroids
+            assignments = self._nearest_centroids(sample, 1)[:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=nlist)[:, None]
+            # Empty buckets keep their previous centroid
+            centroids = np.where(counts > 0, sums / np.maximum(counts, 1), centroids).astype(np.float32)
+        return np.ascontiguousarray(centroids)
+
+
+def build_index(kind: str, matrix: np.ndarray, previous=None, state_dir=None, nprobe: int = 8):
+    """
+    Build a search index snapshot over the gallery matrix.
+
+    Args:
+        kind (str): "exact" or "ivf"
+        matrix (np.ndarray): Contiguous float32 gallery
+        previous: Index from the previous snapshot; its trained state is reused
+        state_dir: Folder where trained state is persisted (None = memory only)
+        nprobe (int): Buckets scanned per query for "ivf"
+
+    Returns:
+        ExactIndex or IvfIndex
+    """
+    if kind == "exact":
+        return ExactIndex(matrix)
+    if kind != "ivf":
+        raise ValueError(f"Unknown face index: {kind}")
+
+    if isinstance(previous, IvfIndex) and previous.centroids is not None:
+        centroids, trained_size = previous.centroids, previous.trained_size
+    elif state_dir:
+        centroids, trained_size = IvfIndex.load_state(state_dir)
+    else:
+        centroids, trained_size = None, 0
+
+    index = IvfIndex(matrix, centroids, trained_size, nprobe=nprobe)
+    if index.retrained and state_dir:
+        index.save_state(state_dir)
+    return index
@@ -1,28 +1,96 @@
 import cv2
 import logging
 import eventlet
+import glob
+import threading
 import time
 import base64
 import numpy as np
 import os
+from eventlet import tpool
 from .simple_facerec import SimpleFacerec
+from .face_tracker import FaceTracker
+from .frame_broadcaster import FrameBroadcaster
+from .jpeg_encoder import JpegEncoder
+from .inference_worker import InferenceWorker
+from .camera_process import CameraProcess
+from .frame_grabber import FrameGrabber
+from .frame_scheduler import FrameScheduler
+from .config import Config
+
+def create_face_recognizer(images_path):
+    """Build the CCTV SimpleFacerec from Config and load the gallery."""
+    sfr = SimpleFacerec(
+        cache_dir=Config.FACE_ENCODING_CACHE_DIR,
+        index=Config.FACE_INDEX,
+        nprobe=Config.FACE_INDEX_NPROBE,
+        detection_model=Config.CCTV_FACE_DETECTION_MODEL,
+        upsample=Config.CCTV_FACE_UPSAMPLE,
+        frame_resizing=Config.CCTV_FACE_RESIZE,
+        num_jitters=Config.CCTV_FACE_NUM_JITTERS,
+        encoding_model=Config.FACE_ENCODING_MODEL,
+        enroll_num_jitters=Config.FACE_ENROLL_NUM_JITTERS
+    )
+    sfr.load_encoding_images(images_path)
+    return sfr
+
+def create_face_tracker(sfr):
+    """Build the FaceTracker from Config, or None when tracking is disabled."""
+    if not Config.FACE_TRACKING:
+        return None
+    return FaceTracker(
+        sfr,
+        iou_threshold=Config.FACE_TRACK_IOU,
+        reencode_every=Config.FACE_REENCODE_EVERY,
+        max_misses=Config.FACE_TRACK_MAX_MISSES
+    )
+
+def person_stem(name):
+    """File/folder stem for a person's name, rejecting anything that could leave images/."""
+    stem = str(name).strip().replace(' ', '_')
+    separators = [sep for sep in ('/', '\\', os.sep, os.altsep) if sep]
+    if (not stem or stem.startswith('.') or '..' in stem or '\0' in stem
+            or any(sep in stem for sep in separators)):
+        raise ValueError(f"Invalid person name: {name!r}")
+    return stem
 
 class FaceManager:
-    def __init__(self, socketio, images_path, camera_index=1):
+    def __init__(self, socketio, images_path, camera_index=1, use_process=False):
         self.logger = logging.getLogger(__name__)
         self.socketio = socketio
         self.images_path = images_path
         self.camera_index = camera_index
+        self.use_process = use_process
         
         # State
         self.cap = None
+        self.grabber = None
         self.sfr = None
+        self.tracker = None
+        self.tracker_stale = False
+        self.camera_process = None
         self.last_detected_names = set()
         self.last_detection_time = time.time()
+        self.face_locations = []
+        self.face_names = []
+        self.resize_tuned = not Config.CCTV_FACE_AUTO_RESIZE
+        self.running = False
+        self.producer = None
+        self.broadcaster = FrameBroadcaster("CCTV Cam", JpegEncoder(Config.JPEG_ENCODER),
+                                            default_quality=Config.JPEG_QUALITY,
+                                            send_timeout=Config.STREAM_SEND_TIMEOUT)
+        self.inference = InferenceWorker("CCTV Cam")
+        self.enrollment_lock = threading.Lock() # Serializes add/remove; recognition keeps running
+        self.scheduler = FrameScheduler(Config.CCTV_TARGET_FPS, Config.MIN_INFERENCE_FPS)
 
         self._initialize_components()
 
     def _initialize_components(self):
+        if self.use_process:
+            # Camera and recognizer live in a dedicated worker process
+            self.camera_process = CameraProcess("face", self.camera_index, self.images_path)
+            return
+
         # Initialize Camera
         self.cap = cv2.VideoCapture(self.camera_index)
         if not self.cap.isOpened():
@@ -33,64 +101,148 @@ class FaceManager:
 
         # Initialize Face Recognition
         try:
-            self.sfr = SimpleFacerec()
-            self.sfr.load_encoding_images(self.images_path)
+            self.sfr = create_face_recognizer(self.images_path)
+            self.tracker = create_face_tracker(self.sfr)
             self.logger.info(f"Loaded face recognition images from {self.images_path}")
         except Exception as e:
             self.logger.error(f"Failed to initialize SimpleFacerec: {e}")
             self.sfr = None
 
+    def start(self):
+        """Spawn the single capture+recognition producer for this camera."""
+        if self.producer is None:
+            self.running = True
+            if self.camera_process:
+                self.camera_process.start()
+                self.producer = eventlet.spawn(self._process_loop)
+            else:
+                if self.cap and self.cap.isOpened():
+                    self.grabber = FrameGrabber(self.cap, "CCTV Cam")
+                    self.grabber.start()
+                self.producer = eventlet.spawn(self._capture_loop)
+
     def release(self):
+        self.running = False
+        if self.camera_process:
+            self.camera_process.release()
+        if self.grabber:
+            self.grabber.stop()
+            self.logger.info(f"{self.grabber.name} frame stats: {self.grabber.stats()}")
         if self.cap:
             self.cap.release()
             self.logger.info("CCTV camera released.")
 
-    def generate_frames(self):
+    def generate_frames(self, width=None, quality=None, client_id="unknown"):
+        """MJPEG stream for one viewer, fed by the shared producer."""
+        return self.broadcaster.subscribe(width, quality, client_id)
+
+    def _capture_loop(self):
         """Video processing loop for CCTV with Face Detection."""
-        while True:
+        frame_id = 0
+        while self.running:
             if not self.cap or not self.cap.isOpened():
                 self.logger.warning("CCTV cam not available, sleeping.")
                 eventlet.sleep(5)
                 continue
 
-            ret, frame = self.cap.read()
-            if not ret:
-                self.logger.warning("Failed to read frame from CCTV camera.")
-                eventlet.sleep(0.5)
+            # Always take the newest frame; stale ones are dropped by the grabber
+            frame_id, frame = self.grabber.read(frame_id)
+            if frame is None:
+                eventlet.sleep(0.005)
                 continue
             
-            # Face Detection Logic
+            # Size the detection resize to this machine once, on a real frame
+            if self.sfr and not self.resize_tuned:
+                self.resize_tuned = True
+                self.inference.run(self.sfr.auto_tune_resize, frame, Config.CCTV_FACE_AUTO_RESIZE_FPS)
+
+            # Face Detection Logic (drawing and encoding only while someone watches)
+            infer = self.scheduler.begin_frame()
+            watched = self.broadcaster.subscriber_count > 0
             if self.sfr:
-                self._process_faces(frame)
+                self._process_faces(frame, infer, draw=watched)
             
-            # Encode Frame
-            try:
-                ret, buffer_frame = cv2.imencode('.jpg', frame)
-                if ret:
-                    frame_bytes = buffer_frame.tobytes()
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
-            except Exception as e:
-                self.logger.error(f"Error encoding CCTV frame: {e}")
-                
-            eventlet.sleep(0.03)
+            if watched:
+                self.broadcaster.publish(frame)
+            self.scheduler.end_frame(infer)
+
+    def _process_loop(self):
+        """Consume frames and recognized faces from the CCTV worker process."""
+        while self.running:
+            # Respawns a crashed worker (with backoff)
+            if not self.camera_process.ensure_running():
+                eventlet.sleep(1)
+                continue
 
-    def _process_faces(self, frame):
+            frame, result = self.camera_process.read_latest()
+            if frame is None:
+                eventlet.sleep(0.01)
+                continue
+
+            watched = self.broadcaster.subscriber_count > 0
+            self._annotate_faces(frame, result["locations"], result["names"], draw=watched)
+            if watched:
+                self.broadcaster.publish(frame)
+
+    def stats(self):
+        """Pacing and capture counters for this camera."""
+        # In process mode frames are paced by the worker's scheduler, not this one
+        scheduler = self.camera_process.scheduler_stats if self.camera_process else self.scheduler.stats()
+        stats = {"scheduler": scheduler, "stream": self.broadcaster.stats()}
+        if self.camera_process:
+            stats["process"] = self.camera_process.stats()
+        if self.grabber:
+            stats["grabber"] = self.grabber.stats()
+        if self.tracker:
+            stats["tracker"] = self.tracker.stats()
+        return stats
+
+    def _process_faces(self, frame, infer=True, draw=True):
+        try:
+            if not infer:
+                # Skipped by the scheduler: keep the last boxes on screen
+                if draw:
+                    self._draw_faces(frame, self.face_locations, self.face_names)
+                return
+
+            # Recognition runs off the eventlet hub; with tracking, only new or
+            # due-for-recheck faces are encoded
+            self.face_locations, self.face_names = self.inference.run(self._recognize, frame)
+            self._annotate_faces(frame, self.face_locations, self.face_names, draw)
+        except Exception as e:
+            self.logger.error(f"Error during face detection: {e}")
+
+    def _recognize(self, frame):
+        """Runs on the inference worker, which owns the tracker."""
+        if not self.tracker:
+            return self.sfr.detect_known_faces(frame)
+        if self.tracker_stale:
+            self.tracker_stale = False
+            self.tracker.reset()
+        return self.tracker.update(frame)
+
+    def _draw_faces(self, frame, face_locations, face_names):
+        for face_loc, name in zip(face_locations, face_names):
+            y1, x2, y2, x1 = face_loc[0], face_loc[1], face_loc[2], face_loc[3]
+            color = (0, 200, 0) if name != "Unknown" else (0, 0, 255)
+
+            cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+            cv2.rectangle(frame, (x1, y2 - 35), (x2, y2), color, cv2.FILLED)
+            cv2.putText(frame, name, (x1 + 6, y2 - 6), cv2.FONT_HERSHEY_DUPLEX, 1.0, (255, 255, 255), 1)
+
+    def _annotate_faces(self, frame, face_locations, face_names, draw=True):
+        """Draw recognized faces and emit alerts for newly seen people."""
         try:
-            face_locations, face_names = self.sfr.detect_known_faces(frame)
-            
             # Reset tracker after 5 seconds
             if time.time() - self.last_detection_time > 5:
                 self.last_detected_names = set()
-                
+
+            # Draw UI
+            if draw:
+                self._draw_faces(frame, face_locations, face_names)
+
             for face_loc, name in zip(face_locations, face_names):
                 y1, x2, y2, x1 = face_loc[0], face_loc[1], face_loc[2], face_loc[3]
-                color = (0, 200, 0) if name != "Unknown" else (0, 0, 255)
-
-                # Draw UI
-                cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                cv2.rectangle(frame, (x1, y2 - 35), (x2, y2), color, cv2.FILLED)
-                cv2.putText(frame, name, (x1 + 6, y2 - 6), cv2.FONT_HERSHEY_DUPLEX, 1.0, (255, 255, 255), 1)
 
                 # Emit Alert for new detection
                 if name not in self.last_detected_names:
@@ -98,7 +250,7 @@ class FaceManager:
                     self.last_detected_names.add(name)
                     self.last_detection_time = time.time()
         except Exception as e:
-            self.logger.error(f"Error during face detection: {e}")
+            self.logger.error(f"Error annotating faces: {e}")
 
     def _emit_activity_alert(self, name, frame, coords):
         self.logger.info(f"Face detected: {name}")
@@ -136,19 +288,79 @@ class FaceManager:
                 raise ValueError("Failed to decode image from base64 data")
 
             # Save Image
-            filename = name.replace(' ', '_') + ".jpg"
-            save_path = os.path.join(self.images_path, filename)
-            cv2.imwrite(save_path, image_cv)
+            filename = person_stem(name) + ".jpg"
+            save_path = self._gallery_path(filename)
+            # Write beside it and rename into place: replacing a directory entry bumps the
+            # folder mtime, which is how worker processes notice re-enrollments too.
+            # The dot prefix keeps the temp file out of the gallery glob.
+            tmp_path = self._gallery_path("." + filename + ".tmp.jpg")
+            if not cv2.imwrite(tmp_path, image_cv):
+                raise ValueError(f"Failed to write image for {name}")
+            os.replace(tmp_path, save_path)
             self.logger.info(f"Saved new person: {save_path}")
             
-            # Reload Model
-            if self.sfr:
-                self.logger.info("Reloading face recognition encodings...")
-                self.sfr.load_encoding_images(self.images_path)
-                self.logger.info("Model reloaded.")
+            # Enroll (worker processes watch the images folder themselves)
+            if self.camera_process:
+                self.logger.info("Camera process will pick up the new image from disk.")
+            elif self.sfr:
+                with self.enrollment_lock:
+                    # Only the new image is encoded; the gallery is swapped in atomically
+                    found = tpool.execute(self.sfr.add_person, save_path)
+                if not found:
+                    self.logger.warning(f"No face found in image for {name}")
+                self._reset_tracker()
+                self.logger.info(f"Enrolled {name}.")
             else:
-                self.logger.warning("SimpleFacerec not initialized, cannot reload.")
+                self.logger.warning("SimpleFacerec not initialized, cannot enroll.")
                 
         except Exception as e:
             self.logger.error(f"Error adding new person: {e}")
-            self.socketio.emit('add_person_error', {'error': str(e)})
\ No newline at end of file
+            self.socketio.emit('add_person_error', {'error': str(e)})
+
+    def remove_person(self, data):
+        """Handle request to remove a person's face from the database."""
+        try:
+            name = data['name']
+            stem = person_stem(name)
+            self.logger.info(f"Received request to remove person: {name}")
+
+            # Single photo (<name>.jpg) and/or a folder of photos (<name>/*.jpg)
+            person_dir = self._gallery_path(stem)
+            pattern = os.path.join(glob.escape(self.images_path), glob.escape(stem) + ".*")
+            image_files = [path for path in glob.glob(pattern)
+                           if os.path.splitext(os.path.basename(path))[0] == stem and os.path.isfile(path)]
+            if os.path.isdir(person_dir):
+                image_files += glob.glob(os.path.join(glob.escape(person_dir), "*.*"))
+            if not image_files:
+                raise ValueError(f"No enrolled images for {name}")
+            # Symlinks could still point outside; check every target before deleting anything
+            image_files = [self._gallery_path(path) for path in image_files]
+
+            if self.sfr:
+                with self.enrollment_lock:
+                    tpool.execute(self.sfr.remove_person, stem)
+                self._reset_tracker()
+
+            # Delete the images last so a worker process reload also drops the person
+            for path in image_files:
+                os.remove(path)
+            if os.path.isdir(person_dir) and not os.listdir(person_dir):
+                os.rmdir(person_dir)
+            self.logger.info(f"Removed person: {name} ({len(image_files)} image(s))")
+
+        except Exception as e:
+            self.logger.error(f"Error removing person: {e}")
+            self.socketio.emit('remove_person_error', {'error': str(e)})
+
+    def _gallery_path(self, path):
+        """Resolve path under images_path, refusing anything that ends up outside it."""
+        root = os.path.realpath(self.images_path)
+        resolved = os.path.realpath(os.path.join(self.images_path, path))
+        if resolved == root or os.path.commonpath([root, resolved]) != root:
+            raise ValueError(f"Path outside the images folder: {path}")
+        return os.path.join(self.images_path, path)
+
+    def _reset_tracker(self):
+        # Re-encode everyone against the new gallery. The producer resets the tracker
+        # before its next recognition, so enrollment never competes for an inference slot
+        self.tracker_stale = True
@@ -0,0 +1,129 @@
+import itertools
+import numpy as np
+from typing import List, Tuple
+
+
+class FaceTrack:
+    """A face followed across frames, with the name from its last encoding."""
+
+    def __init__(self, track_id: int, location, name: str):
+        self.track_id = track_id
+        self.location = location
+        self.name = name
+        self.frames_since_encoding = 0
+        self.misses = 0
+
+
+def _iou(a, b) -> float:
+    # Locations are face_recognition order: (top, right, bottom, left)
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    inter = max(0, right - left) * max(0, bottom - top)
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    union = area_a + area_b - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """
+    Track-by-detection layer in front of SimpleFacerec.
+
+    Faces are located on every call but only encoded (the expensive 128-d
+    step) when they start a new track or their track is due for a periodic
+    re-check. Names stay attached to track IDs, so they don't flicker
+    between recognitions.
+    """
+
+    def __init__(self, sfr, iou_threshold: float = 0.3, reencode_every: int = 15, max_misses: int = 5):
+        """
+        Args:
+            sfr (SimpleFacerec): Recognizer used to locate and encode faces
+            iou_threshold (float): Minimum overlap to continue a track
+            reencode_every (int): Re-encode a tracked face after this many frames
+            max_misses (int): Frames a track survives without a matching face
+        """
+        self.sfr = sfr
+        self.iou_threshold = iou_threshold
+        self.reencode_every = reencode_every
+        self.max_misses = max_misses
+
+        # State
+        self.tracks = []
+        self._ids = itertools.count(1)
+
+        # Stats
+        self.faces_located = 0
+        self.faces_encoded = 0
+
+    def reset(self) -> None:
+        """Forget all tracks, e.g. after the gallery changed."""
+        self.tracks = []
+
+    def update(self, frame) -> Tuple[np.ndarray, List[str]]:
+        """
+        Locate faces, re-use names of matched tracks and encode only what is needed.
+
+        Args:
+            frame: BGR frame at full size
+
+        Returns:
+            tuple: (face_locations at full size, face_names), same shape as detect_known_faces
+        """
+        rgb_small_frame, small_locations = self.sfr.locate_faces(frame)
+        locations = self.sfr.scale_locations(small_locations).reshape(-1, 4).tolist()
+        self.faces_located += len(locations)
+
+        # Greedy IoU association, best overlaps first
+        pairs = sorted(
+            ((_iou(track.location, location), t, d)
+             for t, track in enumerate(self.tracks) for d, location in enumerate(locations)),
+            reverse=True)
+        track_for_detection = {}
+        used_tracks = set()
+        for overlap, t, d in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if t in used_tracks or d in track_for_detection:
+                continue
+            used_tracks.add(t)
+            track_for_detection[d] = self.tracks[t]
+
+        # Encode new faces and tracks due for a re-check (this frame is the Nth since the last encoding)
+        to_encode = [d for d in range(len(locations))
+                     if d not in track_for_detection
+                     or track_for_detection[d].frames_since_encoding + 1 >= self.reencode_every]
+        names = self.sfr.recognize_faces(rgb_small_frame, [small_locations[d] for d in to_encode])
+        self.faces_encoded += len(to_encode)
+        encoded_names = dict(zip(to_encode, names))
+
+        # Age unmatched tracks, then update or create matched ones
+        for t, track in enumerate(self.tracks):
+            if t not in used_tracks:
+                track.misses += 1
+        self.tracks = [track for t, track in enumerate(self.tracks)
+                       if t in used_tracks or track.misses <= self.max_misses]
+
+        for d, location in enumerate(locations):
+            track = track_for_detection.get(d)
+            if track is None:
+                track = FaceTrack(next(self._ids), location, encoded_names[d])
+                self.tracks.append(track)
+                continue
+            track.location = location
+            track.misses = 0
+            track.frames_since_encoding += 1
+            if d in encoded_names:
+                track.name = encoded_names[d]
+                track.frames_since_encoding = 0
+
+        # Briefly missed tracks stay on screen at their last position
+        return np.array([track.location for track in self.tracks], dtype=int), \
+            [track.name for track in self.tracks]
+
+    def stats(self) -> dict:
+        return {
+            "tracks": len(self.tracks),
+            "located": self.faces_located,
+            "encoded": self.faces_encoded,
+        }
@@ -1,10 +1,26 @@
 import cv2
 import numpy as np
 from ultralytics import YOLO
-import cvzone
 import logging
+import time
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import List, NamedTuple, Tuple, Optional
+from .motion_gate import MotionGate
+from .overlay_renderer import OverlayRenderer
+
+
+class Detection(NamedTuple):
+    """A single detected box, in resized-frame pixel coordinates."""
+    box: np.ndarray
+    class_name: str
+    confidence: float
+
+    def as_dict(self) -> dict:
+        return {
+            "class": self.class_name,
+            "confidence": round(float(self.confidence), 3),
+            "box": [int(v) for v in self.box],
+        }
 
 
 class Detector:
@@ -14,26 +30,59 @@ class Detector:
         target_height: int = 640,
         iou_threshold: float = 0.2,
         min_confidence: float = 0.5,
-        smoke_confidence: float = 0.75
+        smoke_confidence: float = 0.75,
+        infer_every_n: int = 1,
+        infer_interval_ms: float = 0,
+        propagate_boxes: bool = False,
+        motion_gate: Optional[MotionGate] = None,
+        model: Optional[YOLO] = None,
+        batcher=None
         ):
         """
         Initialize the FireDetector with a YOLO model.
 
         Args:
-            model_path (Path): Path to the YOLO model file
+            model_path (Path): Path to the YOLO model (.pt, exported .onnx or OpenVINO folder)
             target_height (int): Target height for frame resizing
             iou_threshold (float): IOU threshold for non-maximum suppression
             min_confidence (float): Minimum confidence threshold for detections
+            infer_every_n (int): Run the model at most once every N frames
+            infer_interval_ms (float): Minimum time between two model runs
+            propagate_boxes (bool): Shift re-used boxes with sparse optical flow
+            motion_gate (MotionGate): Optional pre-filter skipping static scenes
+            model (YOLO): Already loaded model to share instead of loading model_path
+            batcher (MicroBatcher): Optional batcher shared with other cameras
         """
         self.logger = logging.getLogger(__name__)
 
         try:
-            self.model = YOLO(str(model_path))
+            # Exported models run on their own runtime behind the same predict API
+            self.model = model if model is not None else YOLO(str(model_path), task='detect')
             self.target_height = target_height
             self.iou_threshold = iou_threshold
             self.min_confidence = min_confidence
             self.smoke_confidence = smoke_confidence
-            self.names = self.model.model.names
+            self.infer_every_n = max(1, infer_every_n)
+            self.infer_interval = infer_interval_ms / 1000.0
+            self.propagate_boxes = propagate_boxes
+            self.motion_gate = motion_gate
+            self.batcher = batcher
+            # Resolved through the predictor, so it also works for exported (.onnx/OpenVINO) models
+            self.names = self.model.names
+
+            # Last inference result, re-drawn on frames that skip the model
+            self.last_boxes = []
+            self.last_detection = None
+            self.ran_inference = False
+            self._frames_since_inference = 0
+            self._last_inference_time = 0.0
+            self._prev_gray = None
+
+            # Overlay drawing with preallocated buffers and cached text sprites
+            self.renderer = OverlayRenderer()
+            self._conf_text = f"Conf: {self.min_confidence:.2f} | IOU: {self.iou_threshold:.2f}"
+            self._conf_text_width = cv2.getTextSize(
+                self._conf_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0][0]
 
             # Define colors for different classes
             self.colors = {
@@ -46,6 +95,27 @@ class Detector:
             self.logger.error(f"Failed to initialize fire detector: {e}")
             raise
 
+    @property
+    def last_confidence(self) -> float:
+        """Highest confidence among the current detections (0 when there are none)."""
+        return max((box.confidence for box in self.last_boxes), default=0.0)
+
+    @property
+    def hazard_confidences(self) -> dict:
+        """
+        Highest confidence per hazard class in the current detections, e.g. {"Fire": 0.8}.
+
+        Only boxes that pass the same per-class thresholds as the detection
+        status count, so the UI state never flags what the detector rejected.
+        """
+        thresholds = {"Fire": self.min_confidence, "Smoke": self.smoke_confidence}
+        confidences = {}
+        for box in self.last_boxes:
+            hazard = box.class_name.capitalize()
+            if box.confidence >= thresholds.get(hazard, float("inf")):
+                confidences[hazard] = max(confidences.get(hazard, 0.0), box.confidence)
+        return confidences
+
     def resize_frame(self, frame: np.ndarray) -> np.ndarray:
         """
         Resize frame maintaining aspect ratio.
@@ -93,12 +163,8 @@ class Detector:
             text_y = y1 - 5  # Place label above box
             rect_y = y1
 
-        # Draw semi-transparent background for box
-        overlay = frame.copy()
-        cv2.rectangle(overlay, (x1, y1), (x2, y2),
-                      color, -1)  # Filled rectangle
-        cv2.addWeighted(overlay, 0.2, frame, 0.8, 0,
-                        frame)  # Transparency effect
+        # Draw semi-transparent background for box (blended inside the box only)
+        self.renderer.blend_box(frame, box, color, alpha=0.2)
 
         # Draw box outline
         cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
@@ -119,68 +185,231 @@ class Detector:
         cv2.line(frame, (x2, y2), (x2 - corner_length, y2), color, thickness)
         cv2.line(frame, (x2, y2), (x2, y2 - corner_length), color, thickness)
 
-        # Add detection label with enhanced visibility
-        cvzone.putTextRect(
+        # Add detection label with enhanced visibility (cached cvzone-style sprite)
+        self.renderer.draw_label(
             frame,
             text,
             (x1, text_y),
+            color,
             scale=1.5,
             thickness=2,
-            colorR=color,
-            colorT=(255, 255, 255),  # White text
-            font=cv2.FONT_HERSHEY_SIMPLEX,
             offset=5,
             border=2,
-            colorB=(0, 0, 0),  # Black border
+            color_text=(255, 255, 255),  # White text
+            color_border=(0, 0, 0),  # Black border
         )
 
-    def process_frame(self, frame: np.ndarray) -> Tuple[np.ndarray, Optional[str]]:
+    def process_frame(self, frame: np.ndarray, infer: bool = True) -> Tuple[np.ndarray, Optional[str]]:
         """
         Process a video frame to detect fire and smoke with enhanced visualization.
 
         Args:
             frame (np.ndarray): Input frame
+            infer (bool): Allow the model to run; the detector's own cadence may
+                still re-use (and optionally shift) the last detections
 
         Returns:
             tuple: (processed_frame, detection: str)
         """
         try:
             frame = self.resize_frame(frame)
-            results = self.model(
-                frame, iou=self.iou_threshold, conf=self.min_confidence)
-            detection = None
+            self._update_detections(frame, infer)
+
+            for box, class_name, confidence in self.last_boxes:
+                self.draw_detection(frame, box, class_name, confidence)
 
-            if results and len(results[0].boxes) > 0:
-                boxes = results[0].boxes.xyxy.cpu().numpy().astype(int)
-                class_ids = results[0].boxes.cls.cpu().numpy().astype(int)
-                confidences = results[0].boxes.conf.cpu().numpy()
+            # Add frame metadata
+            self._add_frame_info(frame, self.last_detection)
 
-                # Sort detections by confidence
-                sort_idx = np.argsort(-confidences)  # Descending order
-                boxes = boxes[sort_idx]
-                class_ids = class_ids[sort_idx]
-                confidences = confidences[sort_idx]
+            return frame, self.last_detection
 
-                for box, class_id, confidence in zip(boxes, class_ids, confidences):
-                    class_name = self.names[class_id]
+        except Exception as e:
+            self.logger.error(f"Error processing frame: {e}")
+            return frame, None
 
-                    # Update overall detection status
-                    if detection is None:  # Only update if not already set
-                        if "fire" == class_name.lower() and confidence >= self.min_confidence:
-                            detection = "Fire"
-                        elif "smoke" == class_name.lower() and confidence >= self.smoke_confidence:
-                            detection = "Smoke"
+    def render(self, frame: np.ndarray, boxes: List[Detection], detection: Optional[str]) -> np.ndarray:
+        """
+        Resize and annotate a raw frame exactly like process_frame, with given detections.
 
-                    self.draw_detection(frame, box, class_name, confidence)
+        Args:
+            frame (np.ndarray): Raw input frame
+            boxes (List[Detection]): Detections in resized-frame coordinates
+            detection (Optional[str]): Detection status for the status bar
 
-            # Add frame metadata
-            self._add_frame_info(frame, detection)
+        Returns:
+            np.ndarray: Annotated frame
+        """
+        frame = self.resize_frame(frame)
+        for box, class_name, confidence in boxes:
+            self.draw_detection(frame, box, class_name, confidence)
+        self._add_frame_info(frame, detection)
+        return frame
+
+    def detect(self, frame: np.ndarray, infer: bool = True) -> Tuple[List[Detection], Optional[str]]:
+        """
+        Detection-only counterpart of process_frame: no boxes, labels or status bar are drawn.
 
-            return frame, detection
+        Args:
+            frame (np.ndarray): Input frame
+            infer (bool): Allow the model to run (same cadence rules as process_frame)
 
+        Returns:
+            tuple: (detections sorted by confidence, detection: str)
+        """
+        try:
+            self._update_detections(self.resize_frame(frame), infer)
+            return list(self.last_boxes), self.last_detection
         except Exception as e:
-            self.logger.error(f"Error processing frame: {e}")
-            return frame, None
+            self.logger.error(f"Error detecting on frame: {e}")
+            return [], None
+
+    def _update_detections(self, frame: np.ndarray, infer: bool) -> None:
+        """Run the model when due, otherwise re-use (and optionally shift) the last detections."""
+        due = infer and self._inference_due() and \
+            (self.motion_gate is None or self.motion_gate.should_infer(frame))
+        self.ran_inference = False
+        if due:
+            try:
+                self.last_boxes, self.last_detection = self._detect(frame)
+            except Exception:
+                # Never re-use the previous result as if it were fresh evidence
+                self.last_boxes, self.last_detection = [], None
+                self._frames_since_inference += 1
+                raise
+            self.ran_inference = True
+            self._frames_since_inference = 0
+            self._last_inference_time = time.monotonic()
+        else:
+            self._frames_since_inference += 1
+
+        if self.propagate_boxes:
+            self._track_boxes(frame)
+
+    def _inference_due(self) -> bool:
+        """Check the every-N-frames / every-T-ms cadence."""
+        if self._frames_since_inference + 1 < self.infer_every_n:
+            return False
+        return time.monotonic() - self._last_inference_time >= self.infer_interval
+
+    def _track_boxes(self, frame: np.ndarray) -> None:
+        """
+        Shift re-used boxes by the median optical flow of corners inside them.
+
+        Args:
+            frame (np.ndarray): Resized current frame
+        """
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        prev_gray, self._prev_gray = self._prev_gray, gray
+        if self.ran_inference or prev_gray is None or not self.last_boxes:
+            return
+
+        height, width = gray.shape[:2]
+        tracked_boxes = []
+        for box, class_name, confidence in self.last_boxes:
+            x1, y1, x2, y2 = box
+            points = None
+            if x2 - x1 > 4 and y2 - y1 > 4:
+                points = cv2.goodFeaturesToTrack(
+                    prev_gray[y1:y2, x1:x2], maxCorners=20, qualityLevel=0.01, minDistance=5)
+            if points is not None:
+                points = points + np.array([x1, y1], dtype=np.float32)
+                moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None)
+                good = status.reshape(-1) == 1
+                if good.any():
+                    dx, dy = np.median((moved - points).reshape(-1, 2)[good], axis=0)
+                    box = np.array([
+                        np.clip(x1 + dx, 0, width - 1), np.clip(y1 + dy, 0, height - 1),
+                        np.clip(x2 + dx, 0, width - 1), np.clip(y2 + dy, 0, height - 1)
+                    ]).astype(int)
+            tracked_boxes.append(Detection(box, class_name, confidence))
+        self.last_boxes = tracked_boxes
+
+    def process_batch(self, frames: List[np.ndarray]) -> List[Tuple[np.ndarray, Optional[str]]]:
+        """
+        Detect and annotate several frames (e.g. one per camera) in a single model call.
+
+        Unlike process_frame this is stateless: no cadence, gating or box re-use.
+
+        Args:
+            frames (List[np.ndarray]): Input frames
+
+        Returns:
+            list: (processed_frame, detection: str) for each input frame, in order
+        """
+        frames = [self.resize_frame(frame) for frame in frames]
+        processed = []
+        for frame, (boxes, detection) in zip(frames, self.detect_batch(frames)):
+            for box, class_name, confidence in boxes:
+                self.draw_detection(frame, box, class_name, confidence)
+            self._add_frame_info(frame, detection)
+            processed.append((frame, detection))
+        return processed
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[Tuple[List[Detection], Optional[str]]]:
+        """
+        Run the model once on a list of resized frames.
+
+        Args:
+            frames (List[np.ndarray]): Resized input frames
+
+        Returns:
+            list: (boxes, detection: str) for each input frame, in order
+        """
+        results = self.model(
+            frames, iou=self.iou_threshold, conf=self.min_confidence)
+        return [self._parse_result(result) for result in results]
+
+    def _detect(self, frame: np.ndarray) -> Tuple[List[Detection], Optional[str]]:
+        """
+        Run the model on a resized frame, batched with other cameras when a batcher is set.
+
+        Args:
+            frame (np.ndarray): Resized input frame
+
+        Returns:
+            tuple: (detections sorted by confidence, detection: str)
+        """
+        if self.batcher is not None:
+            return self.batcher.detect(frame)
+        return self.detect_batch([frame])[0]
+
+    def _parse_result(self, result) -> Tuple[List[Detection], Optional[str]]:
+        """
+        Convert one YOLO result into sorted boxes and an overall detection label.
+
+        Args:
+            result: Ultralytics result for a single frame
+
+        Returns:
+            tuple: (detections sorted by confidence, detection: str)
+        """
+        detection = None
+        detected_boxes = []
+
+        if len(result.boxes) > 0:
+            boxes = result.boxes.xyxy.cpu().numpy().astype(int)
+            class_ids = result.boxes.cls.cpu().numpy().astype(int)
+            confidences = result.boxes.conf.cpu().numpy()
+
+            # Sort detections by confidence
+            sort_idx = np.argsort(-confidences)  # Descending order
+            boxes = boxes[sort_idx]
+            class_ids = class_ids[sort_idx]
+            confidences = confidences[sort_idx]
+
+            for box, class_id, confidence in zip(boxes, class_ids, confidences):
+                class_name = self.names[class_id]
+
+                # Update overall detection status
+                if detection is None:  # Only update if not already set
+                    if "fire" == class_name.lower() and confidence >= self.min_confidence:
+                        detection = "Fire"
+                    elif "smoke" == class_name.lower() and confidence >= self.smoke_confidence:
+                        detection = "Smoke"
+
+                detected_boxes.append(Detection(box, class_name, float(confidence)))
+
+        return detected_boxes, detection
 
     def _add_frame_info(self, frame: np.ndarray, detection: Optional[str]) -> None:
         """
@@ -192,22 +421,13 @@ class Detector:
         """
         height, width = frame.shape[:2]
 
-        # Add semi-transparent overlay at the bottom
+        # Add semi-transparent overlay at the bottom (80% black blend, in place)
         overlay_height = 40
-        overlay = frame[height-overlay_height:height, 0:width].copy()
-        cv2.rectangle(frame, (0, height-overlay_height),
-                      (width, height), (0, 0, 0), -1)
-        cv2.addWeighted(overlay, 0.2, frame[height-overlay_height:height, 0:width], 0.8, 0,
-                        frame[height-overlay_height:height, 0:width])
+        self.renderer.darken(frame, height-overlay_height, alpha=0.2)
 
         # Add status text
         status_text = f"Status: {detection if detection else 'No Detection'}"
-        cv2.putText(frame, status_text, (10, height-15),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
-
-        # Add confidence threshold info
-        conf_text = f"Conf: {self.min_confidence:.2f} | IOU: {self.iou_threshold:.2f}"
-        text_size = cv2.getTextSize(
-            conf_text, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)[0]
-        cv2.putText(frame, conf_text, (width - text_size[0] - 10, height-15),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+        self.renderer.draw_text(frame, status_text, (10, height-15))
+
+        # Add confidence threshold info (constant, so its width is measured once)
+        self.renderer.draw_text(frame, self._conf_text, (width - self._conf_text_width - 10, height-15))
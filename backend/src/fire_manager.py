@@ -2,26 +2,94 @@ import cv2
 import logging
 import eventlet
 from .fire_detector import Detector
+from .alert_debouncer import AlertDebouncer
+from .hazard_state import HazardState
+from .motion_gate import MotionGate
+from .frame_broadcaster import FrameBroadcaster
+from .jpeg_encoder import JpegEncoder
+from .inference_worker import InferenceWorker, InferenceQueueFull
+from .camera_process import CameraProcess
+from .frame_grabber import FrameGrabber
+from .frame_scheduler import FrameScheduler
+from .config import Config
+from .inference_backend import resolve_model_path
+
+def create_detector(model_path, batcher=None):
+    """Build the fire Detector with the runtime, cadence and gating settings from Config."""
+    if batcher is None:
+        model_path = resolve_model_path(
+            model_path,
+            backend=Config.INFERENCE_BACKEND,
+            int8=Config.INFERENCE_INT8,
+            cache_dir=Config.EXPORTED_MODELS_DIR,
+            calibration_data=Config.INFERENCE_INT8_DATA or None
+        )
+    return Detector(
+        model_path,
+        iou_threshold=0.20,
+        infer_every_n=Config.FIRE_INFER_EVERY_N,
+        infer_interval_ms=Config.FIRE_INFER_INTERVAL_MS,
+        propagate_boxes=Config.FIRE_BOX_PROPAGATION,
+        motion_gate=MotionGate(
+            changed_fraction=Config.FIRE_MOTION_CHANGED_FRACTION,
+            max_skip_seconds=Config.FIRE_FORCED_INFERENCE_S
+        ) if Config.FIRE_MOTION_GATING else None,
+        model=batcher.detector.model if batcher else None,
+        batcher=batcher
+    )
 
 class FireManager:
-    def __init__(self, socketio, model_path, camera_index=0):
+    def __init__(self, socketio, model_path, camera_index=0, use_process=False, batcher=None, notifier=None):
         self.logger = logging.getLogger(__name__)
         self.socketio = socketio
         self.camera_index = camera_index
         self.model_path = model_path
+        self.use_process = use_process
+        self.batcher = batcher
+        self.notifier = notifier
         
         # State
         self.cap = None
+        self.grabber = None
         self.detector = None
-        self.fire_detected_last_frame = False
+        self.camera_process = None
+        self.running = False
+        self.producer = None
+        self.broadcaster = FrameBroadcaster(f"Fire Cam {camera_index}", JpegEncoder(Config.JPEG_ENCODER),
+                                            default_quality=Config.JPEG_QUALITY,
+                                            send_timeout=Config.STREAM_SEND_TIMEOUT)
+        self.inference = InferenceWorker(f"Fire Cam {camera_index}")
+        self.scheduler = FrameScheduler(Config.FIRE_TARGET_FPS, Config.MIN_INFERENCE_FPS)
+        self.alert_debouncer = AlertDebouncer(
+            confirm_frames=Config.FIRE_ALERT_CONFIRM_FRAMES,
+            window_frames=Config.FIRE_ALERT_WINDOW_FRAMES,
+            coalesce_seconds=Config.FIRE_ALERT_COALESCE_S,
+            cooldown_seconds=Config.ALERT_COOLDOWN
+        )
+        self.hazard_states = {
+            hazard: HazardState(
+                hazard,
+                raise_threshold=Config.HAZARD_RAISE_CONFIDENCE[hazard],
+                clear_threshold=Config.HAZARD_CLEAR_CONFIDENCE[hazard],
+                raise_hold=Config.HAZARD_RAISE_HOLD_S,
+                clear_hold=Config.HAZARD_CLEAR_HOLD_S,
+                smoothing=Config.HAZARD_SMOOTHING_S
+            )
+            for hazard in ("Fire", "Smoke")
+        }
         
         self._initialize_components()
 
     def _initialize_components(self):
+        if self.use_process:
+            # Model and camera live in a dedicated worker process
+            self.camera_process = CameraProcess("fire", self.camera_index, self.model_path)
+            return
+
         try:
             # Initialize Detector
-            self.detector = Detector(self.model_path, iou_threshold=0.20)
-            self.logger.info(f"Loaded detection model: {self.model_path.name}")
+            self.detector = create_detector(self.model_path, self.batcher)
+            self.logger.info(f"Loaded detection model: {self.model_path.name} ({Config.INFERENCE_BACKEND})")
 
             # Initialize Camera
             self.cap = cv2.VideoCapture(self.camera_index)
@@ -32,56 +100,145 @@ class FireManager:
         except Exception as e:
             self.logger.critical(f"Failed to initialize FireManager components: {e}")
 
+    def start(self):
+        """Spawn the single capture+inference producer for this camera."""
+        if self.producer is None:
+            self.running = True
+            if self.camera_process:
+                self.camera_process.start()
+                self.producer = eventlet.spawn(self._process_loop)
+            else:
+                if self.cap and self.cap.isOpened():
+                    self.grabber = FrameGrabber(self.cap, f"Fire Cam {self.camera_index}")
+                    self.grabber.start()
+                self.producer = eventlet.spawn(self._capture_loop)
+
     def release(self):
+        self.running = False
+        if self.camera_process:
+            self.camera_process.release()
+        if self.grabber:
+            self.grabber.stop()
+            self.logger.info(f"{self.grabber.name} frame stats: {self.grabber.stats()}")
         if self.cap:
             self.cap.release()
             self.logger.info("Fire camera released.")
 
-    def generate_frames(self):
+    def generate_frames(self, width=None, quality=None, client_id="unknown"):
+        """MJPEG stream for one viewer, fed by the shared producer."""
+        return self.broadcaster.subscribe(width, quality, client_id)
+
+    def _capture_loop(self):
         """Video processing loop for the FIRE camera."""
-        while True:
+        frame_id = 0
+        while self.running:
             if not self.cap or not self.cap.isOpened():
                 self.logger.warning("Fire cam not available, sleeping.")
                 eventlet.sleep(5)
                 continue
                 
-            ret, frame = self.cap.read()
-            if not ret:
-                self.logger.warning("Failed to read frame from fire camera.")
-                eventlet.sleep(0.5)
+            # Always take the newest frame; stale ones are dropped by the grabber
+            frame_id, frame = self.grabber.read(frame_id)
+            if frame is None:
+                eventlet.sleep(0.005)
                 continue
 
-            # Process Frame with AI Model
-            processed_frame, detection = self.detector.process_frame(frame)
+            # Process Frame with AI Model (off the eventlet hub); under load the
+            # scheduler skips inference on some frames and last boxes are re-drawn.
+            # With nobody watching, only detect: no drawing and no JPEG encoding.
+            infer = self.scheduler.begin_frame()
+            watched = self.broadcaster.subscriber_count > 0
+            try:
+                if watched:
+                    processed_frame, detection = self.inference.run(self.detector.process_frame, frame, infer)
+                else:
+                    _, detection = self.inference.run(self.detector.detect, frame, infer)
+            except InferenceQueueFull:
+                self.scheduler.end_frame(False)
+                continue
 
             # Handle Alerts
-            self._handle_alerts(detection)
+            # The alert image is rendered from the raw frame, so it looks the same whether or not anyone watches
+            self._handle_alerts(detection, self.detector.last_confidence, self.detector.hazard_confidences,
+                                frame, self.detector.ran_inference, boxes=list(self.detector.last_boxes))
+            if watched:
+                self.broadcaster.publish(processed_frame)
+            self.scheduler.end_frame(self.detector.ran_inference)
+
+    def _process_loop(self):
+        """Consume frames and detections from the fire camera worker process."""
+        while self.running:
+            # Respawns a crashed worker (with backoff)
+            if not self.camera_process.ensure_running():
+                eventlet.sleep(1)
+                continue
 
-            # Encode Frame
+            processed_frame, result = self.camera_process.read_latest()
+            if processed_frame is None:
+                eventlet.sleep(0.01)
+                continue
+
+            self._handle_alerts(result.get("detection"), result.get("confidence", 0.0),
+                                result.get("confidences", {}), processed_frame, result.get("inferred", True))
+            if self.broadcaster.subscriber_count > 0:
+                self.broadcaster.publish(processed_frame)
+
+    def stats(self):
+        """Pacing and capture counters for this camera."""
+        # In process mode frames are paced by the worker's scheduler, not this one
+        scheduler = self.camera_process.scheduler_stats if self.camera_process else self.scheduler.stats()
+        stats = {"scheduler": scheduler, "stream": self.broadcaster.stats(),
+                 "hazards": {hazard: state.stats() for hazard, state in self.hazard_states.items()}}
+        if self.camera_process:
+            stats["process"] = self.camera_process.stats()
+        if self.grabber:
+            stats["grabber"] = self.grabber.stats()
+        if self.detector and self.detector.motion_gate:
+            stats["motion_gate"] = self.detector.motion_gate.stats()
+        if self.batcher:
+            stats["batcher"] = self.batcher.stats()
+        if self.notifier:
+            stats["alerts"] = self.alert_debouncer.stats()
+        return stats
+
+    def _handle_alerts(self, detection, confidence=0.0, confidences=None, frame=None, inferred=True, boxes=None):
+        self._notify(detection, confidence, frame, inferred, boxes)
+
+        # Only fresh inference results are evidence; re-used boxes would skew the average
+        if not inferred:
+            return
+        confidences = confidences or {}
+        for hazard, state in self.hazard_states.items():
+            transition = state.update(confidences.get(hazard, 0.0))
+            if transition is True:
+                self.logger.warning(f"🐦‍🔥 {hazard} DETECTED on Fire Cam {self.camera_index} "
+                                    f"(smoothed confidence {state.level:.2f})! Emitting alert to web UI")
+                alert_data = {
+                    "sensor": f"{hazard} Sensor",
+                    "status": "DANGER",
+                    "description": f"{hazard} detected in video feed!"
+                }
+                self.socketio.emit('hazard_alert', alert_data)
+            elif transition is False:
+                self.logger.info(f"✅ {hazard} Cleared on Fire Cam {self.camera_index}. Emitting clear event to web UI")
+                self.socketio.emit('hazard_cleared', { "sensor": f"{hazard} Sensor" })
+
+    def _notify(self, detection, confidence, frame, inferred, boxes=None):
+        """
+        Send confirmed, coalesced hazards to the external channels (Telegram/WhatsApp).
+
+        frame is either raw, with boxes to draw on it, or already annotated (process
+        mode, boxes=None); either way the alert carries the annotated detector-size image.
+        """
+        if not self.notifier or frame is None:
+            return
+        alert = self.alert_debouncer.update(detection, confidence, frame, inferred, boxes)
+        if alert and alert.boxes is not None:
+            alert = alert._replace(frame=self.detector.render(alert.frame, alert.boxes, alert.detection))
+        if alert:
+            self.logger.warning(f"📣 Sending {alert.detection} notification from Fire Cam {self.camera_index} "
+                                f"(confidence {alert.confidence:.2f})")
             try:
-                ret, buffer = cv2.imencode('.jpg', processed_frame)
-                if ret:
-                    frame_bytes = buffer.tobytes()
-                    yield (b'--frame\r\n'
-                           b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                self.notifier.send_alert(alert.frame, alert.detection)
             except Exception as e:
-                self.logger.error(f"Error encoding fire frame: {e}")
-                
-            eventlet.sleep(0.03) # ~30 FPS
-
-    def _handle_alerts(self, detection):
-        if detection and not self.fire_detected_last_frame:
-            self.logger.warning(f"🐦‍🔥 {detection} DETECTED! Emitting alert to web UI")
-            alert_data = {
-                "sensor": f"{detection} Sensor",
-                "status": "DANGER",
-                "description": f"{detection} detected in video feed!"
-            }
-            self.socketio.emit('hazard_alert', alert_data)
-            self.fire_detected_last_frame = True 
-        
-        elif not detection and self.fire_detected_last_frame:
-            self.logger.info("✅ Hazard Cleared. Emitting clear event to web UI")
-            self.socketio.emit('hazard_cleared', { "sensor": "Fire Sensor" })
-            self.socketio.emit('hazard_cleared', { "sensor": "Smoke Sensor" })
-            self.fire_detected_last_frame = False
\ No newline at end of file
+                self.logger.error(f"Failed to queue {alert.detection} notification: {e}")
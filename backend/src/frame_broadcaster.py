@@ -0,0 +1,190 @@
+import cv2
+import errno
+import eventlet
+import logging
+import threading
+import time
+import numpy as np
+from typing import Optional
+from .jpeg_encoder import JpegEncoder
+
+
+class EncodedFrame:
+    """
+    One published frame plus its lazily encoded JPEG variants.
+
+    Each (width, quality) variant is encoded at most once, however many
+    subscribers ask for it.
+    """
+
+    def __init__(self, frame: np.ndarray, encoder: JpegEncoder):
+        self.frame = frame
+        self.encoder = encoder
+        self.published_at = time.monotonic()
+        self._variants = {}
+        self._lock = threading.Lock()
+
+    def jpeg(self, width: Optional[int] = None, quality: int = 95) -> bytes:
+        """Return the JPEG for this variant, encoding it on first request."""
+        if width is not None and width >= self.frame.shape[1]:
+            width = None  # Never upscale; share the full-size variant
+        key = (width, quality)
+
+        with self._lock:
+            data = self._variants.get(key)
+            if data is None:
+                image = self.frame
+                if width is not None:
+                    height = int(self.frame.shape[0] * width / self.frame.shape[1])
+                    image = cv2.resize(self.frame, (width, height), interpolation=cv2.INTER_AREA)
+                data = self.encoder.encode(image, quality)
+                self._variants[key] = data
+            return data
+
+
+class StreamClient:
+    """Per-subscriber delivery state and stats."""
+
+    def __init__(self, client_id: str, width: Optional[int], quality: int):
+        self.client_id = client_id
+        self.width = width
+        self.quality = quality
+        self.greenlet = eventlet.getcurrent()
+
+        # State
+        self.sending = False
+        self.send_started = 0.0
+        self.last_sent = time.monotonic()
+
+        # Stats
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.lag = 0.0
+
+    def stats(self) -> dict:
+        return {
+            "client": self.client_id,
+            "width": self.width,
+            "quality": self.quality,
+            "sent": self.frames_sent,
+            "dropped": self.frames_dropped,
+            "lag_ms": round(self.lag * 1000, 1),
+        }
+
+
+class FrameBroadcaster:
+    """
+    Fan-out buffer holding the latest frame of one camera.
+
+    A single producer publishes frames; any number of MJPEG subscribers
+    read the newest frame without triggering extra capture or inference,
+    each at its own resolution and JPEG quality. A subscriber that falls
+    behind skips straight to the newest frame (its send queue holds one
+    frame), and one stuck in a socket write is disconnected by a watchdog.
+    """
+
+    def __init__(self, name: str, encoder: Optional[JpegEncoder] = None, default_quality: int = 95,
+                 send_timeout: float = 10.0):
+        """
+        Args:
+            name (str): Camera label used in log messages
+            encoder (JpegEncoder): Encoder shared by every variant
+            default_quality (int): JPEG quality when a viewer asks for none
+            send_timeout (float): Seconds a single frame write may block before the client is dropped
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.encoder = encoder or JpegEncoder()
+        self.default_quality = default_quality
+        self.send_timeout = send_timeout
+
+        # State (threading is monkey-patched by eventlet, so this is green)
+        self._condition = threading.Condition()
+        self._latest = None
+        self._sequence = 0
+        self._clients = set()
+        self._watchdog = None
+        self.subscriber_count = 0
+
+    def publish(self, frame: np.ndarray) -> None:
+        """Replace the latest frame and wake up every waiting subscriber."""
+        encoded = EncodedFrame(frame, self.encoder)
+        with self._condition:
+            self._latest = encoded
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def subscribe(self, width: Optional[int] = None, quality: Optional[int] = None,
+                  client_id: str = "unknown", timeout: float = 5.0):
+        """
+        MJPEG generator yielding the newest frame each time the client is ready.
+
+        If no new frame arrives within timeout the last one is re-sent as a
+        keepalive, so dead connections surface on the next write.
+        """
+        client = StreamClient(client_id, width, quality or self.default_quality)
+        with self._condition:
+            self._clients.add(client)
+            self.subscriber_count += 1
+            # Send the current frame right away if there is one; otherwise wait for the next publish
+            last_sequence = self._sequence - 1 if self._latest is not None else self._sequence
+        self._start_watchdog()
+        self.logger.info(f"📺 {self.name} subscriber {client_id} joined ({self.subscriber_count} watching)")
+
+        try:
+            while True:
+                with self._condition:
+                    self._condition.wait_for(lambda: self._sequence != last_sequence, timeout)
+                    if self._latest is None:
+                        continue
+                    if last_sequence and self._sequence - last_sequence > 1:
+                        client.frames_dropped += self._sequence - last_sequence - 1
+                    last_sequence = self._sequence
+                    encoded = self._latest
+
+                try:
+                    frame_bytes = encoded.jpeg(client.width, client.quality)
+                except Exception as e:
+                    self.logger.error(f"Error encoding {self.name} frame: {e}")
+                    continue
+
+                client.sending = True
+                client.send_started = time.monotonic()
+                yield (b'--frame\r\n'
+                       b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                # Resumed: the server has written the previous part to the socket
+                client.sending = False
+                client.last_sent = time.monotonic()
+                client.lag = client.last_sent - encoded.published_at
+                client.frames_sent += 1
+        finally:
+            with self._condition:
+                self._clients.discard(client)
+                self.subscriber_count -= 1
+                if self.subscriber_count == 0:
+                    # Producers stop publishing while unwatched; never serve that frame to a later viewer
+                    self._latest = None
+            self.logger.info(f"📴 {self.name} subscriber {client_id} left ({self.subscriber_count} watching), "
+                             f"sent {client.frames_sent}, dropped {client.frames_dropped}")
+
+    def stats(self) -> dict:
+        with self._condition:
+            clients = [client.stats() for client in self._clients]
+        return {"frames_published": self._sequence, "subscribers": clients}
+
+    def _start_watchdog(self) -> None:
+        if self._watchdog is None:
+            self._watchdog = eventlet.spawn(self._watch_clients)
+
+    def _watch_clients(self) -> None:
+        """Disconnect clients whose socket write has been blocked for too long."""
+        while True:
+            eventlet.sleep(self.send_timeout / 2)
+            now = time.monotonic()
+            with self._condition:
+                stalled = [client for client in self._clients
+                           if client.sending and now - client.send_started > self.send_timeout]
+            for client in stalled:
+                self.logger.warning(f"⏱️ {self.name} subscriber {client.client_id} stalled, disconnecting")
+                # A broken-socket error lets the WSGI server close the response cleanly
+                eventlet.kill(client.greenlet, ConnectionResetError(errno.ECONNRESET, "MJPEG client stalled"))
@@ -0,0 +1,97 @@
+import math
+import time
+import eventlet
+
+
+class FrameScheduler:
+    """
+    Paces one camera loop to a target FPS.
+
+    Each frame sleeps only for what is left of its budget after capture,
+    inference and encoding. When inference alone no longer fits the budget,
+    the scheduler runs inference on every Nth frame instead, so the display
+    rate holds while the inference rate degrades gracefully.
+    """
+
+    def __init__(self, target_fps: float = 30.0, min_inference_fps: float = 2.0,
+                 smoothing: float = 0.2, sleep=eventlet.sleep):
+        """
+        Args:
+            target_fps (float): Display rate the loop aims for
+            min_inference_fps (float): Inference rate never degraded below
+            smoothing (float): EMA weight given to the newest timing sample
+            sleep: Sleep function (eventlet.sleep on the hub, time.sleep elsewhere)
+        """
+        self.target_fps = target_fps
+        self.frame_budget = 1.0 / target_fps
+        self.max_stride = max(1, int(target_fps // min_inference_fps))
+        self.smoothing = smoothing
+        self.sleep = sleep
+
+        # State
+        self.inference_stride = 1
+        self._frame_index = 0
+        self._frame_start = 0.0
+        self._inference_time = 0.0
+        self._display_time = 0.0
+
+        # Stats
+        self._window_start = time.monotonic()
+        self._window_frames = 0
+        self._window_inferences = 0
+        self.achieved_fps = 0.0
+        self.inference_fps = 0.0
+
+    def begin_frame(self) -> bool:
+        """Start timing a frame and report whether it should run inference."""
+        self._frame_start = time.monotonic()
+        infer = self._frame_index % self.inference_stride == 0
+        self._frame_index += 1
+        return infer
+
+    def end_frame(self, inferred: bool) -> None:
+        """Record the frame's cost, adapt the stride and sleep off the remaining budget."""
+        now = time.monotonic()
+        elapsed = now - self._frame_start
+
+        if inferred:
+            self._inference_time += self.smoothing * (elapsed - self._inference_time)
+        else:
+            self._display_time += self.smoothing * (elapsed - self._display_time)
+        self._update_stride()
+        self._update_rates(now, inferred)
+
+        # Always yield, even when the frame overran its budget
+        self.sleep(max(0.0, self.frame_budget - elapsed))
+
+    def _update_stride(self) -> None:
+        # One inference frame plus (stride - 1) display-only frames must fit
+        # in stride frame budgets: t_inf + (s - 1) * t_disp <= s * budget
+        if self._inference_time <= self.frame_budget:
+            stride = 1
+        elif self._display_time >= self.frame_budget:
+            stride = self.max_stride
+        else:
+            stride = math.ceil((self._inference_time - self._display_time) /
+                               (self.frame_budget - self._display_time))
+        self.inference_stride = min(self.max_stride, max(1, stride))
+
+    def _update_rates(self, now: float, inferred: bool) -> None:
+        self._window_frames += 1
+        self._window_inferences += int(inferred)
+
+        window = now - self._window_start
+        if window >= 1.0:
+            self.achieved_fps = self._window_frames / window
+            self.inference_fps = self._window_inferences / window
+            self._window_start = now
+            self._window_frames = 0
+            self._window_inferences = 0
+
+    def stats(self) -> dict:
+        return {
+            "target_fps": self.target_fps,
+            "achieved_fps": round(self.achieved_fps, 1),
+            "inference_fps": round(self.inference_fps, 1),
+            "inference_stride": self.inference_stride,
+        }
@@ -0,0 +1,96 @@
+import math
+import time
+from typing import Optional
+
+
+class HazardState:
+    """
+    Hysteresis state machine for one hazard (fire or smoke) on one camera.
+
+    The per-frame confidence is smoothed with a time-based exponential
+    moving average, so the smoothing is the same at any inference rate.
+    The hazard is raised once the average has stayed at or above
+    raise_threshold for raise_hold seconds, and cleared only after it has
+    stayed at or below the lower clear_threshold for clear_hold seconds.
+    A single missed detection therefore neither clears nor re-raises it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        raise_threshold: float = 0.5,
+        clear_threshold: float = 0.25,
+        raise_hold: float = 0.5,
+        clear_hold: float = 5.0,
+        smoothing: float = 0.5
+        ):
+        """
+        Args:
+            name (str): Hazard label, e.g. "Fire"
+            raise_threshold (float): Smoothed confidence needed to raise the hazard
+            clear_threshold (float): Smoothed confidence below which it may clear
+            raise_hold (float): Seconds the average must stay above raise_threshold
+            clear_hold (float): Seconds the average must stay below clear_threshold
+            smoothing (float): EMA time constant in seconds
+        """
+        self.name = name
+        self.raise_threshold = raise_threshold
+        self.clear_threshold = min(clear_threshold, raise_threshold)
+        self.raise_hold = raise_hold
+        self.clear_hold = clear_hold
+        self.smoothing = smoothing
+
+        # State
+        self.active = False
+        self.level = 0.0
+        self._last_update = None
+        self._crossed_since = None
+
+        # Stats
+        self.transitions = 0
+
+    def update(self, confidence: float, now: Optional[float] = None) -> Optional[bool]:
+        """
+        Feed the highest confidence for this hazard in a freshly inferred frame.
+
+        Args:
+            confidence (float): 0 when the hazard was not detected
+            now (float): Monotonic timestamp (defaults to time.monotonic())
+
+        Returns:
+            bool: True when the hazard was raised, False when it was cleared,
+                None when the state did not change
+        """
+        now = time.monotonic() if now is None else now
+        if self._last_update is None:
+            alpha = 1.0
+        else:
+            alpha = 1.0 - math.exp(-(now - self._last_update) / self.smoothing) if self.smoothing > 0 else 1.0
+        self.level += alpha * (confidence - self.level)
+        self._last_update = now
+
+        # Is the average on the far side of the threshold for the opposite state?
+        if self.active:
+            crossed, hold = self.level <= self.clear_threshold, self.clear_hold
+        else:
+            crossed, hold = self.level >= self.raise_threshold, self.raise_hold
+
+        if not crossed:
+            self._crossed_since = None
+            return None
+        if self._crossed_since is None:
+            self._crossed_since = now
+        if now - self._crossed_since < hold:
+            return None
+
+        self.active = not self.active
+        self._crossed_since = None
+        self.transitions += 1
+        return self.active
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "level": round(self.level, 3),
+            "transitions": self.transitions,
+        }
@@ -0,0 +1,85 @@
+import hashlib
+import logging
+import shutil
+from pathlib import Path
+from typing import Optional
+from filelock import FileLock
+from ultralytics import YOLO
+
+logger = logging.getLogger(__name__)
+
+# Ultralytics export format for each supported runtime
+EXPORT_FORMATS = {
+    "onnx": "onnx",          # ONNX Runtime (CPUExecutionProvider)
+    "openvino": "openvino",  # OpenVINO IR
+}
+
+
+def file_digest(path: Path, length: int = 16) -> str:
+    """Short SHA-256 of a file, used to key exported models on the weights."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def resolve_model_path(
+    model_path: Path,
+    backend: str = "pytorch",
+    int8: bool = False,
+    cache_dir: Optional[Path] = None,
+    calibration_data: Optional[str] = None
+    ) -> Path:
+    """
+    Return the model to load for the requested runtime, exporting it once if needed.
+
+    Exports are cached under cache_dir keyed on the .pt file's hash, so a
+    retrained model is re-exported automatically and restarts load instantly.
+    They use a dynamic batch axis, so the multi-camera MicroBatcher can send
+    several frames per call; a static export only accepts a batch of 1.
+
+    Args:
+        model_path (Path): Path to the PyTorch .pt weights
+        backend (str): "pytorch", "onnx" or "openvino"
+        int8 (bool): Quantize to INT8 during export (OpenVINO only)
+        cache_dir (Path): Folder holding exported models
+        calibration_data (str): Dataset yaml for INT8 calibration
+
+    Returns:
+        Path: Path to the .pt file, the exported .onnx file or the OpenVINO folder
+    """
+    if backend == "pytorch" or model_path.suffix != '.pt':
+        return model_path
+    if backend not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported inference backend: {backend}")
+
+    cache_dir = cache_dir or model_path.parent / 'exported'
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    quant = "-int8" if int8 and backend == "openvino" else ""
+    # "-dynamic" keeps earlier static-batch exports from being picked up
+    stem = f"{model_path.stem}-{file_digest(model_path)}-dynamic{quant}"
+    if backend == "onnx":
+        target = cache_dir / f"{stem}.onnx"
+    else:
+        # Ultralytics recognises an OpenVINO model by the "_openvino_model" folder suffix
+        target = cache_dir / f"{stem}_openvino_model"
+
+    # Several camera processes may start at once; only one of them exports
+    with FileLock(str(target) + ".lock"):
+        if target.exists():
+            logger.info(f"Using cached {backend} model: {target.name}")
+            return target
+
+        logger.info(f"Exporting {model_path.name} to {backend}{quant} (one-time)...")
+        export_args = {"format": EXPORT_FORMATS[backend], "dynamic": True}
+        if quant:
+            export_args["int8"] = True
+            if calibration_data:
+                export_args["data"] = calibration_data
+        exported = Path(YOLO(str(model_path)).export(**export_args))
+
+        shutil.move(str(exported), str(target))
+        logger.info(f"Exported model cached at {target}")
+        return target
@@ -0,0 +1,46 @@
+import logging
+from eventlet import tpool
+from eventlet.semaphore import Semaphore
+
+
+class InferenceQueueFull(RuntimeError):
+    """Raised when a model already has max_pending calls queued or running."""
+
+
+class InferenceWorker:
+    """
+    Runs blocking model calls on eventlet's native thread pool.
+
+    The calling greenthread waits for the result while the hub keeps serving
+    Socket.IO heartbeats, handlers and the other camera's stream.
+    """
+
+    def __init__(self, name: str, max_workers: int = 1, max_pending: int = 2):
+        """
+        Args:
+            name (str): Label used in log messages
+            max_workers (int): Native threads allowed inside the model at once
+            max_pending (int): Bound on queued + running calls before rejecting
+        """
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self._workers = Semaphore(max_workers)
+        self._pending = Semaphore(max_pending)
+
+        # Stats
+        self.completed = 0
+        self.rejected = 0
+
+    def run(self, fn, *args, **kwargs):
+        """Execute fn(*args, **kwargs) in a native thread and return its result."""
+        if not self._pending.acquire(blocking=False):
+            self.rejected += 1
+            raise InferenceQueueFull(f"{self.name} inference queue is full")
+
+        try:
+            with self._workers:
+                result = tpool.execute(fn, *args, **kwargs)
+            self.completed += 1
+            return result
+        finally:
+            self._pending.release()
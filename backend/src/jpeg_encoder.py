@@ -0,0 +1,55 @@
+import cv2
+import logging
+import numpy as np
+
+# Optional libjpeg-turbo bindings, tried in order of preference
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+try:
+    from turbojpeg import TurboJPEG
+except ImportError:
+    TurboJPEG = None
+
+
+class JpegEncoder:
+    """
+    JPEG encoder for BGR frames using the fastest available library.
+
+    Uses simplejpeg or PyTurboJPEG (both libjpeg-turbo) when installed and
+    falls back to cv2.imencode otherwise.
+    """
+
+    def __init__(self, prefer: str = "auto"):
+        """
+        Args:
+            prefer (str): "auto", "simplejpeg", "turbojpeg" or "opencv"
+        """
+        self.logger = logging.getLogger(__name__)
+        self._turbo = None
+        self.backend = "opencv"
+
+        if prefer in ("auto", "simplejpeg") and simplejpeg is not None:
+            self.backend = "simplejpeg"
+        elif prefer in ("auto", "turbojpeg") and TurboJPEG is not None:
+            try:
+                self._turbo = TurboJPEG()
+                self.backend = "turbojpeg"
+            except Exception as e:
+                self.logger.warning(f"libjpeg-turbo unavailable, using OpenCV encoder: {e}")
+
+        self.logger.info(f"JPEG encoder: {self.backend}")
+
+    def encode(self, frame: np.ndarray, quality: int = 95) -> bytes:
+        """Encode a BGR frame to JPEG bytes."""
+        if self.backend == "simplejpeg":
+            return simplejpeg.encode_jpeg(np.ascontiguousarray(frame), quality=quality, colorspace='BGR')
+        if self.backend == "turbojpeg":
+            return self._turbo.encode(frame, quality=quality)
+
+        ret, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+        if not ret:
+            raise ValueError("JPEG encoding failed")
+        return buffer.tobytes()
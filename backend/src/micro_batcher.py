@@ -0,0 +1,109 @@
+import logging
+from eventlet import patcher
+
+# Callers are inference worker threads, so these must be native primitives
+threading = patcher.original('threading')
+time = patcher.original('time')
+
+
+class _BatchRequest:
+    __slots__ = ('frame', 'result', 'error', 'done')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.result = None
+        self.error = None
+        self.done = False
+
+
+class MicroBatcher:
+    """
+    Collects frames from several cameras into one YOLO call.
+
+    Each camera's inference thread calls detect(). The first caller to find
+    no batch in flight becomes the leader: it waits up to max_wait_ms for
+    more frames (or until max_batch_size is reached), runs the batch and
+    hands every caller its own (boxes, detection) result.
+    """
+
+    def __init__(self, detector, max_batch_size: int = 4, max_wait_ms: float = 10):
+        """
+        Args:
+            detector (Detector): Detector whose model and thresholds run the batch
+            max_batch_size (int): Largest number of frames per model call
+            max_wait_ms (float): Longest time a leader waits to fill a batch
+        """
+        self.logger = logging.getLogger(__name__)
+        self.detector = detector
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        # State
+        self._condition = threading.Condition()
+        self._pending = []
+        self._leader_active = False
+
+        # Stats
+        self.batches = 0
+        self.frames = 0
+
+    def detect(self, frame):
+        """Detect on one resized frame, batched with concurrent callers."""
+        request = _BatchRequest(frame)
+        with self._condition:
+            self._pending.append(request)
+            self._condition.notify_all()
+
+            while not request.done:
+                if self._leader_active:
+                    self._condition.wait()
+                    continue
+
+                self._leader_active = True
+                batch = self._collect_batch()
+                self._condition.release()
+                try:
+                    self._run_batch(batch)
+                finally:
+                    self._condition.acquire()
+                    self._leader_active = False
+                    self._condition.notify_all()
+
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _collect_batch(self):
+        # Called with the condition held
+        deadline = time.monotonic() + self.max_wait
+        while len(self._pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._condition.wait(remaining)
+
+        batch = self._pending[:self.max_batch_size]
+        del self._pending[:self.max_batch_size]
+        return batch
+
+    def _run_batch(self, batch):
+        try:
+            results = self.detector.detect_batch([request.frame for request in batch])
+            for request, result in zip(batch, results):
+                request.result = result
+        except Exception as e:
+            self.logger.error(f"Batched inference failed: {e}")
+            for request in batch:
+                request.error = e
+
+        self.batches += 1
+        self.frames += len(batch)
+        for request in batch:
+            request.done = True
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "frames": self.frames,
+            "mean_batch_size": round(self.frames / self.batches, 2) if self.batches else 0.0,
+        }
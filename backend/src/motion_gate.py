@@ -0,0 +1,78 @@
+import cv2
+import time
+import numpy as np
+
+
+class MotionGate:
+    """
+    Cheap pre-filter that skips inference on static scenes.
+
+    Each candidate frame is downscaled, blurred and compared against the
+    frame that last passed the gate. Inference is skipped while the changed
+    area stays below a threshold, but is forced periodically so slow-growing
+    smoke is still caught.
+    """
+
+    def __init__(
+        self,
+        downscale_width: int = 160,
+        pixel_threshold: int = 25,
+        changed_fraction: float = 0.005,
+        max_skip_seconds: float = 2.0
+        ):
+        """
+        Args:
+            downscale_width (int): Width frames are shrunk to before differencing
+            pixel_threshold (int): Gray-level change that counts a pixel as changed
+            changed_fraction (float): Share of changed pixels that opens the gate
+            max_skip_seconds (float): Force an inference after this long gated
+        """
+        self.downscale_width = downscale_width
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_skip_seconds = max_skip_seconds
+
+        # State
+        self._reference = None
+        self._last_pass_time = 0.0
+
+        # Stats
+        self.frames_checked = 0
+        self.frames_gated = 0
+        self.forced_inferences = 0
+
+    def should_infer(self, frame: np.ndarray) -> bool:
+        """
+        Decide whether the frame differs enough from the last inferred one.
+
+        Args:
+            frame (np.ndarray): Input frame (BGR)
+
+        Returns:
+            bool: True when inference should run on this frame
+        """
+        self.frames_checked += 1
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, (self.downscale_width, int(height * self.downscale_width / width)),
+                           interpolation=cv2.INTER_AREA)
+        small = cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+
+        now = time.monotonic()
+        if self._reference is not None and self._reference.shape == small.shape:
+            changed = np.count_nonzero(cv2.absdiff(small, self._reference) > self.pixel_threshold)
+            if changed < self.changed_fraction * small.size:
+                if now - self._last_pass_time < self.max_skip_seconds:
+                    self.frames_gated += 1
+                    return False
+                self.forced_inferences += 1
+
+        self._reference = small
+        self._last_pass_time = now
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "checked": self.frames_checked,
+            "gated": self.frames_gated,
+            "forced": self.forced_inferences,
+        }
@@ -1,20 +1,25 @@
 # notification_service.py
-from concurrent.futures import ThreadPoolExecutor
 from cryptography.fernet import Fernet
 import json
+import random
 import os
-import requests
 import cv2
 import time
 import logging
 import asyncio
+import httpx
 import telegram
+from eventlet import patcher
+from telegram.request import HTTPXRequest
 from pathlib import Path
 from datetime import datetime
 from dotenv import load_dotenv
-from urllib.parse import quote_plus
 from filelock import FileLock
 from io import BytesIO
+from .alert_outbox import AlertOutbox
+
+# Native thread: the notification loop must keep running while the eventlet hub is busy
+threading = patcher.original('threading')
 
 
 # Setup environment and logging
@@ -23,19 +28,91 @@ ENV = PROJECT_ROOT / '.env'
 load_dotenv(ENV, override=True)
 logger = logging.getLogger(__name__)
 
+# python-telegram-bot 20 renamed Unauthorized to Forbidden
+TelegramForbidden = getattr(telegram.error, "Forbidden", None) or telegram.error.Unauthorized
+
+# Outbox priority of fire/smoke alerts (lower is more urgent)
+PRIORITY_ALERT = 0
+
 
 class NotificationService:
+    """
+    Alert dispatcher running one long-lived asyncio loop on a dedicated thread.
+
+    send_alert() only hands the frame to the loop thread, which saves it and
+    records the alert in a durable on-disk outbox, one delivery per enabled
+    channel. The loop thread
+    claims due deliveries most-urgent-first (up to NOTIFICATION_MAX_CONCURRENT
+    at once) over persistent HTTP sessions, retries failures with
+    exponential backoff and resumes unfinished deliveries after a restart.
+    """
+
     def __init__(self, config):
         """Initialize notification services"""
-        self.executor = ThreadPoolExecutor(max_workers=2)
         self.config = config
-        # Create new event loop for this instance
+        self.whatsapp_enabled = False
+        self.telegram_bot = None
+        self.http = None
+        self._dispatcher = None
+        self._chat_registration = None
+
+        # Durable queue; deliveries interrupted by a crash are sent again
+        self.outbox = AlertOutbox(config.NOTIFICATION_OUTBOX_PATH, max_attempts=config.NOTIFICATION_MAX_ATTEMPTS)
+        self.outbox.recover()
+        self.outbox.prune(time.time() - config.NOTIFICATION_OUTBOX_RETENTION_DAYS * 86400)
+
+        # Dedicated event loop, reused for every alert
         self.loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(self.loop)
+        self._loop_ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="notifications", daemon=True)
+        self._thread.start()
+        self._loop_ready.wait()
         self._init_services()
 
+        # Start delivering only once every channel is set up
+        self._run(self._start_dispatcher())
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.config.NOTIFICATION_MAX_CONCURRENT)
+        self.loop.call_soon(self._loop_ready.set)
+        self.loop.run_forever()
+
+    async def _start_dispatcher(self):
+        self._dispatcher = asyncio.create_task(self._dispatch_forever())
+
+    def _run(self, coro, timeout=None):
+        """
+        Run a coroutine on the notification loop and wait for its result.
+
+        Blocks the caller, so it is only used at startup, for test messages and
+        at shutdown. Waits on a native Event rather than a concurrent.futures
+        Future, whose monkey-patched Condition can't be signalled from the loop thread.
+        """
+        done = threading.Event()
+        outcome = {}
+
+        async def runner():
+            try:
+                outcome["result"] = await coro
+            except BaseException as e:
+                outcome["error"] = e
+            finally:
+                done.set()
+
+        self.loop.call_soon_threadsafe(self.loop.create_task, runner())
+        if not done.wait(timeout):
+            raise TimeoutError("Notification loop did not answer in time")
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
     def _init_services(self):
         """Initialize and validate notification providers"""
+        # One pooled HTTP client for Imgur and CallMeBot
+        self.http = self._run(self._open_http())
+
         # WhatsApp initialization
         if all([os.getenv("CALLMEBOT_API_KEY"), os.getenv("RECEIVER_WHATSAPP_NUMBER")]):
             self.whatsapp_enabled = True
@@ -49,20 +126,25 @@ class NotificationService:
         if token := os.getenv("TELEGRAM_TOKEN"):
             try:
                 self.telegram_bot = FlareGuardBot(
-                    token, os.getenv("TELEGRAM_CHAT_ID"))
+                    token, os.getenv("TELEGRAM_CHAT_ID"),
+                    max_concurrent_sends=self.config.TELEGRAM_MAX_CONCURRENT_SENDS)
                 # Run all async initialization together
-                if not self.loop.is_running():
-                    self.loop.run_until_complete(self._init_telegram())
+                self._run(self._init_telegram(), timeout=60)
             except Exception as e:
                 logger.error(f"Telegram setup failed: {e}")
                 self.telegram_bot = None
         else:
             logger.info("Telegram alerts disabled: Missing token")
 
+    async def _open_http(self):
+        return httpx.AsyncClient(timeout=15)
 
     async def _init_telegram(self):
         """Async initialization for Telegram"""
         await self.telegram_bot.initialize()
+        # Picking up new chats long-polls Telegram, so it must not hold up startup;
+        # alerts go to the already registered chats meanwhile
+        self._chat_registration = asyncio.create_task(self.telegram_bot.register_chats())
         logger.info("Telegram service initialized")
 
     def save_frame(self, frame) -> Path:
@@ -72,14 +154,14 @@ class NotificationService:
         cv2.imwrite(str(filename), frame)
         return filename
 
-    def upload_image(self, image_path: Path) -> str:
+    async def upload_image(self, image_path: Path) -> str:
         """Upload image to Imgur CDN"""
         try:
-            response = requests.post(
+            response = await self.http.post(
                 'https://api.imgur.com/3/upload',
                 headers={
                     'Authorization': f'Client-ID {self.config.IMGUR_CLIENT_ID}'},
-                files={'image': image_path.open('rb')},
+                files={'image': (image_path.name, image_path.read_bytes())},
                 timeout=10
             )
             response.raise_for_status()
@@ -88,94 +170,188 @@ class NotificationService:
             logger.error(f"Image upload failed: {str(e)}")
             return None
 
-    def send_alert(self, frame, detection: str = "Fire") -> bool:
-        """Non-blocking alert dispatch"""
-        image_path = self.save_frame(frame)
+    def send_alert(self, frame, detection: str = "Fire", priority: int = PRIORITY_ALERT) -> bool:
+        """
+        Non-blocking alert dispatch; the frame must not be modified afterwards.
 
-        # Submit to background thread
-        future = self.executor.submit(
-            self._send_alerts_async,
-            image_path,
-            detection
-        )
+        The JPEG write and the outbox commit take milliseconds, so they run on
+        the notification thread rather than the caller's (the eventlet hub).
+        """
+        channels = self._enabled_channels()
+        if not channels:
+            logger.warning(f"{detection} alert not sent: no notification channel enabled")
+            return False
 
-        # Error logging callback
-        future.add_done_callback(
-            lambda f: f.exception() and logger.error(
-                f"Alert error: {f.exception()}")
-        )
+        self.loop.call_soon_threadsafe(self._enqueue, frame, detection, priority, channels)
+        return True
 
-        return True  # Immediate success assumption
+    def _enqueue(self, frame, detection, priority, channels):
+        """Save the frame and record the alert in the outbox (on the loop thread)"""
+        try:
+            image_path = self.save_frame(frame)
+            self.outbox.enqueue(priority, image_path, detection, channels)
+        except Exception as e:
+            logger.error(f"Failed to queue {detection} alert: {e}")
+            return
+        self._wakeup.set()
 
-    def _send_alerts_async(self, image_path, detection):
-        """Background alert processing"""
+    def _enabled_channels(self):
+        channels = []
         if self.whatsapp_enabled:
-            self._send_whatsapp_alert(image_path, detection)
+            channels.append("whatsapp")
         if self.telegram_bot:
-            self._send_telegram_alert(image_path, detection)
+            channels.append("telegram")
+        return channels
+
+    async def _next_delivery(self):
+        """Wait until a delivery is due and claim it"""
+        while True:
+            # Cleared before looking, so an alert enqueued meanwhile still wakes us up
+            self._wakeup.clear()
+            delivery = self.outbox.claim_next(time.time())
+            if delivery:
+                return delivery
+
+            next_attempt_at = self.outbox.next_attempt_at()
+            timeout = None if next_attempt_at is None else max(0.0, next_attempt_at - time.time())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_forever(self):
+        """Start due deliveries, most urgent first, as delivery slots free up"""
+        outbox_errors = 0
+        while True:
+            await self._slots.acquire()
+            try:
+                delivery = await self._next_delivery()
+                outbox_errors = 0
+            except Exception as e:
+                # e.g. disk full or I/O error; keep the dispatcher alive and back off
+                self._slots.release()
+                delay = min(self.config.NOTIFICATION_RETRY_MAX_S,
+                            self.config.NOTIFICATION_RETRY_BASE_S * 2 ** outbox_errors)
+                outbox_errors += 1
+                logger.error(f"Alert outbox unavailable: {e}, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                continue
+            task = asyncio.create_task(self._deliver(delivery))
+            task.add_done_callback(lambda _: self._slots.release())
+
+    async def _deliver(self, delivery):
+        """Send one alert on one channel and record the outcome"""
+        image_path = Path(delivery.image_path)
+        error = progress = None
+        try:
+            if delivery.channel == "whatsapp" and self.whatsapp_enabled:
+                sent = await self._send_whatsapp_alert(image_path, delivery.detection)
+            elif delivery.channel == "telegram" and self.telegram_bot:
+                sent, progress = await self._send_telegram_alert(image_path, delivery.detection, delivery.progress)
+            else:
+                sent, error = False, f"{delivery.channel} channel not enabled"
+        except Exception as e:
+            sent, error = False, str(e)
+            logger.error(f"Alert error: {e}")
+
+        try:
+            if sent:
+                self.outbox.mark_sent(delivery)
+                return
+
+            # Exponential backoff with jitter, capped
+            delay = min(self.config.NOTIFICATION_RETRY_MAX_S,
+                        self.config.NOTIFICATION_RETRY_BASE_S * 2 ** delivery.attempts)
+            delay *= random.uniform(0.8, 1.2)
+            retry = self.outbox.mark_failed(delivery, error or "send failed", time.time() + delay, progress)
+        except Exception as e:
+            # Left as 'sending'; recover() returns it to pending on the next start
+            logger.error(f"Failed to record {delivery.channel} delivery of alert {delivery.alert_id}: {e}")
+            return
+        # The dispatcher may be sleeping without a deadline; let it see the new retry time
+        self._wakeup.set()
+        if retry:
+            logger.warning(f"{delivery.channel} delivery of alert {delivery.alert_id} failed, "
+                           f"retry {delivery.attempts + 1} in {delay:.0f}s")
+        else:
+            logger.error(f"{delivery.channel} delivery of alert {delivery.alert_id} "
+                         f"gave up after {delivery.attempts + 1} attempts")
 
-    def _send_whatsapp_alert(self, image_path, detection):
+    async def _send_whatsapp_alert(self, image_path, detection):
         """Handle WhatsApp notification flow"""
-        image_url = self.upload_image(image_path)
+        image_url = await self.upload_image(image_path)
         if not image_url:
             logger.error("WhatsApp alert skipped: Image upload failed")
             return False
 
         message = f"🚨 {detection} Detected! View at {image_url}"
-        encoded_msg = quote_plus(message)
-        url = f"{self.base_url}?" \
-            f"phone={os.getenv('RECEIVER_WHATSAPP_NUMBER')}&" \
-            f"text={encoded_msg}&" \
-            f"apikey={os.getenv('CALLMEBOT_API_KEY')}"
-
-        response = requests.get(url, timeout=15)
-        if response.status_code == 200:
-            logger.info("WhatsApp alert delivered")
-            return True
-        logger.warning(
-            f"WhatsApp Alert Attempt failed: HTTP {response.status_code}")
-        return False
-
-    def _send_telegram_alert(self, image_path, detection):
-        """Handle Telegram notification with proper loop management"""
+        return await self._send_callmebot_message(message)
+
+    async def _send_telegram_alert(self, image_path, detection, progress=None):
+        """
+        Handle Telegram notification.
+
+        Args:
+            progress (str): Encrypted chats left unreached by an earlier attempt (None = all chats)
+
+        Returns:
+            tuple: (sent, progress) where progress holds the chats to retry
+        """
+        chat_ids = self.telegram_bot.decrypt_chat_ids(progress) if progress else None
+        if chat_ids is not None:
+            # Chats removed since the last attempt are no longer owed the alert
+            chat_ids = [chat_id for chat_id in chat_ids if chat_id in self.telegram_bot.chat_ids]
+            if not chat_ids:
+                return True, None
         try:
-            if not self.loop.is_running():
-                asyncio.set_event_loop(self.loop)
-                return self.loop.run_until_complete(
-                    self.telegram_bot.send_alert(
-                        image_path=image_path,
-                        caption=f"🚨 {detection} Detected!"
-                    )
-                )
+            results = await self.telegram_bot.send_alert(
+                image_path=image_path,
+                caption=f"🚨 {detection} Detected!",
+                chat_ids=chat_ids
+            )
         except Exception as e:
             logger.error(f"Telegram alert failed: {str(e)}")
-            return False
+            return False, None
+
+        unreached = [chat_id for chat_id, outcome in results.items() if outcome == "failed"]
+        if not results or (unreached and len(unreached) == len(results)):
+            return False, None
+        if unreached:
+            return False, self.telegram_bot.encrypt_chat_ids(unreached)
+        return True, None
+
+    def stats(self) -> dict:
+        """Outbox delivery counts plus aggregate Telegram delivery counters and latency"""
+        return {
+            "outbox": self.outbox.stats(),
+            "telegram": self.telegram_bot.stats() if self.telegram_bot else {},
+        }
 
     def send_test_message(self):
         """Verify system connectivity"""
+        return self._run(self._send_test_messages(), timeout=120)
+
+    async def _send_test_messages(self):
         success = False
         if self.whatsapp_enabled:
             test_msg = "🔧 System Test: Fire Detection System Operational"
-            success = self._send_callmebot_message(test_msg)
+            success = await self._send_callmebot_message(test_msg)
         if self.telegram_bot:
             try:
                 test_image = Path(PROJECT_ROOT, 'data', "test_image.png")
-                success |= self.loop.run_until_complete(
-                    self.telegram_bot.send_test_alert(test_image))
+                success |= await self.telegram_bot.send_test_alert(test_image)
             except Exception as e:
                 logger.error(f"Telegram test failed: {e}")
                 success = False
         return success
 
-    def _send_callmebot_message(self, message: str) -> bool:
+    async def _send_callmebot_message(self, message: str) -> bool:
         """Core WhatsApp message sender"""
-        encoded_msg = quote_plus(message)
-        url = f"{self.base_url}?" \
-            f"phone={os.getenv('RECEIVER_WHATSAPP_NUMBER')}&" \
-            f"text={encoded_msg}&" \
-            f"apikey={os.getenv('CALLMEBOT_API_KEY')}"
-
-        response = requests.get(url, timeout=15)
+        response = await self.http.get(self.base_url, params={
+            "phone": os.getenv('RECEIVER_WHATSAPP_NUMBER'),
+            "text": message,
+            "apikey": os.getenv('CALLMEBOT_API_KEY'),
+        }, timeout=15)
         if response.status_code == 200:
             logger.info("WhatsApp alert delivered")
             return True
@@ -184,30 +360,50 @@ class NotificationService:
         return False
 
     def cleanup(self):
-        """Proper cleanup of resources"""
+        """Finish in-flight alerts, close sessions and stop the loop thread"""
         try:
-            self.executor.shutdown(wait=True)
-            if hasattr(self, 'loop') and not self.loop.is_closed():
-                # Cancel all pending tasks
-                for task in asyncio.all_tasks(self.loop):
-                    task.cancel()
-                # Run loop one final time to complete cancellation
-                self.loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(self.loop), return_exceptions=True))
-                self.loop.close()
+            if not hasattr(self, 'loop') or self.loop.is_closed():
+                return
+            if self._thread.is_alive():
+                self._run(self._shutdown(), timeout=30)
+                self.loop.call_soon_threadsafe(self.loop.stop)
+                self._thread.join(timeout=5)
+            self.loop.close()
+            self.outbox.close()
         except Exception as e:
             logger.error(f"Cleanup error: {str(e)}")
 
+    async def _shutdown(self):
+        if self._dispatcher:
+            self._dispatcher.cancel()
+        if self._chat_registration:
+            self._chat_registration.cancel()
+        # Let in-flight deliveries finish; everything else stays in the outbox
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        pending = self.outbox.stats()["pending"]
+        if pending:
+            logger.info(f"{pending} alert deliveries left in the outbox for the next start")
+        if self.http:
+            await self.http.aclose()
+        if self.telegram_bot:
+            await self.telegram_bot.shutdown()
+
     def __del__(self):
         """Ensure cleanup is called"""
         self.cleanup()
 
 
 class FlareGuardBot:
-    def __init__(self, token: str, default_chat_id: str = None):
+    def __init__(self, token: str, default_chat_id: str = None, max_concurrent_sends: int = 8):
         self.logger = logging.getLogger(__name__)
         self.token = token
         self.default_chat_id = default_chat_id
-        self.bot = telegram.Bot(token=self.token)
+        self.max_concurrent_sends = max_concurrent_sends
+        # One long-lived connection pool shared by every send
+        self.bot = telegram.Bot(token=self.token, request=HTTPXRequest(
+            connection_pool_size=max_concurrent_sends, pool_timeout=20))
+        self.delivery_stats = {}
         self._init_crypto()
         self.storage_file = Path(__file__).parent / "sysdata.bin"
         self.update_file = Path(__file__).parent / "last_update.bin" 
@@ -215,8 +411,16 @@ class FlareGuardBot:
 
     async def initialize(self):
         """Async initialization sequence"""
+        await self.bot.initialize()
+
+    async def register_chats(self):
+        """Register chats that messaged the bot since the last run (long-polls up to 30 s)"""
         await self._update_chat_ids()
 
+    async def shutdown(self):
+        """Close the HTTP session"""
+        await self.bot.shutdown()
+
     def _init_crypto(self):
         """Initialize encryption system"""
         key = os.getenv("ENCRYPTION_KEY")
@@ -255,6 +459,18 @@ class FlareGuardBot:
         except Exception as e:
             self.logger.error(f"Failed to save chat IDs: {e}")
 
+    def encrypt_chat_ids(self, chat_ids) -> str:
+        """Encrypt a list of chat IDs for storage outside sysdata.bin (e.g. the alert outbox)"""
+        return self.cipher_suite.encrypt(json.dumps(list(chat_ids)).encode()).decode()
+
+    def decrypt_chat_ids(self, token: str):
+        """Inverse of encrypt_chat_ids; None if the token can't be read (e.g. the key changed)"""
+        try:
+            return [int(chat_id) for chat_id in json.loads(self.cipher_suite.decrypt(token.encode()))]
+        except Exception as e:
+            self.logger.error(f"Failed to read stored chat IDs: {e}")
+            return None
+
     def _get_last_update_id(self):
         """Get the encrypted ID of the last processed update"""
         try:
@@ -311,7 +527,7 @@ class FlareGuardBot:
         try:
             await self.bot.send_chat_action(chat_id=chat_id, action="typing")
             return True
-        except telegram.error.Unauthorized:
+        except TelegramForbidden:
             return False
         except Exception:
             # For other errors, assume the chat is still valid
@@ -330,76 +546,152 @@ class FlareGuardBot:
                 id for id in self.chat_ids if id not in invalid_ids]
             self._save_chat_ids()
 
-    async def send_alert(self, image_path: Path, caption: str) -> bool:
-        """Send alert to all registered chats with retry logic and invalid chat cleanup"""
+    async def send_alert(self, image_path: Path, caption: str, chat_ids=None) -> dict:
+        """
+        Send alert to the registered chats concurrently, with retry logic and invalid chat cleanup.
+
+        The photo is uploaded with the first successful send; every other chat
+        receives Telegram's file_id for it instead of the image bytes.
+
+        Args:
+            image_path (Path): Alert image
+            caption (str): Message caption
+            chat_ids (list): Only send to these chats (default: every registered chat)
+
+        Returns:
+            dict: Outcome per chat, "sent", "forbidden" or "failed" (empty if nothing was tried)
+        """
         if not image_path.exists():
             self.logger.error(f"Alert image missing: {image_path}")
-            return False
-
-        overall_success = False
-        failed_chats = []
+            return {}
+        targets = list(self.chat_ids if chat_ids is None else chat_ids)
+        if not targets:
+            return {}
 
         # Read image data once
         with open(image_path, 'rb') as f:
             image_data = f.read()
 
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.max_concurrent_sends)
+        # Chats not reached because of an unexpected error count as failed, so they are retried
+        results = dict.fromkeys(targets, "failed")
+
         try:
-            for chat_id in self.chat_ids:
-                sent = False
-                for attempt in range(3):
-                    try:
-                        # Create new BytesIO for each send attempt
-                        photo = BytesIO(image_data)
-                        photo.name = 'image.jpg'  # Telegram requires a name
-
-                        async with self.bot:  # Create new session for each chat
-                            await self.bot.send_photo(
-                                chat_id=chat_id,
-                                photo=photo,
-                                caption=caption,
-                                parse_mode='Markdown',
-                                pool_timeout=20
-                            )
-                        self.logger.info(
-                            f"Alert sent to Telegram chat {chat_id}")
-                        sent = True
-                        overall_success = True
-                        break
-                    except telegram.error.Unauthorized:
-                        self.logger.warning(f"Unauthorized for chat {chat_id}")
-                        failed_chats.append(chat_id)
-                        break
-                    except telegram.error.TimedOut:
-                        await asyncio.sleep(2 ** attempt)
-                        self.logger.warning(
-                            f"Timeout sending to {chat_id}, retry {attempt+1}/3")
-                    except telegram.error.NetworkError:
-                        await asyncio.sleep(5)
-                        self.logger.warning(
-                            f"Network error with {chat_id}, retry {attempt+1}/3")
-                    except Exception as e:
-                        self.logger.error(
-                            f"Failed to send to {chat_id}: {str(e)}")
-                        if attempt == 2:  # Only add to failed chats after all retries
-                            failed_chats.append(chat_id)
-                        break
-
-                if not sent:
-                    failed_chats.append(chat_id)
-
-            # Clean up invalid chats after sending alerts
-            if failed_chats:
+            # Upload once, trying chats in turn until one accepts the photo
+            chat_ids = list(targets)
+            file_id = None
+            while chat_ids and file_id is None:
+                chat_id = chat_ids.pop(0)
+                results[chat_id], message = await self._send_to_chat(chat_id, image_data, caption, semaphore)
+                if message and message.photo:
+                    file_id = message.photo[-1].file_id
+
+            # Fan out to the rest, re-using the uploaded photo
+            photo = file_id or image_data
+            outcomes = await asyncio.gather(
+                *(self._send_to_chat(chat_id, photo, caption, semaphore) for chat_id in chat_ids))
+            for chat_id, (outcome, _) in zip(chat_ids, outcomes):
+                results[chat_id] = outcome
+
+            # Clean up chats that blocked the bot; transient failures keep their subscription
+            invalid_chats = [chat_id for chat_id, outcome in results.items() if outcome == "forbidden"]
+            if invalid_chats:
                 self.chat_ids = [
-                    id for id in self.chat_ids if id not in failed_chats]
+                    id for id in self.chat_ids if id not in invalid_chats]
                 self._save_chat_ids()
                 self.logger.info(
-                    f"Removed {len(failed_chats)} invalid chat IDs")
+                    f"Removed {len(invalid_chats)} invalid chat IDs")
 
         except Exception as e:
             self.logger.error(f"Telegram error: {str(e)}")
 
-        return overall_success
+        delivered = sum(1 for outcome in results.values() if outcome == "sent")
+        self.logger.info(f"Telegram alert delivered to {delivered}/{len(results)} chats "
+                         f"in {(time.monotonic() - started) * 1000:.0f} ms")
+        return results
+
+    async def _send_to_chat(self, chat_id, photo, caption: str, semaphore: asyncio.Semaphore):
+        """
+        Send one photo to one chat with retries.
+
+        Returns:
+            tuple: (outcome, message) where outcome is "sent", "forbidden" or "failed"
+        """
+        started = time.monotonic()
+        outcome, message = "failed", None
+        for attempt in range(3):
+            try:
+                if isinstance(photo, bytes):
+                    # Create new BytesIO for each send attempt
+                    upload = BytesIO(photo)
+                    upload.name = 'image.jpg'  # Telegram requires a name
+                else:
+                    upload = photo  # file_id of an earlier upload
+                async with semaphore:
+                    message = await self.bot.send_photo(
+                        chat_id=chat_id,
+                        photo=upload,
+                        caption=caption,
+                        parse_mode='Markdown',
+                        pool_timeout=20
+                    )
+                self.logger.info(
+                    f"Alert sent to Telegram chat {chat_id}")
+                outcome = "sent"
+                break
+            except TelegramForbidden:
+                self.logger.warning(f"Unauthorized for chat {chat_id}")
+                outcome = "forbidden"
+                break
+            except telegram.error.RetryAfter as e:
+                # Flood control: wait as long as Telegram asks
+                self.logger.warning(
+                    f"Rate limited sending to {chat_id}, retry {attempt+1}/3")
+                retry_after = e.retry_after
+                await asyncio.sleep(retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else retry_after)
+            except telegram.error.TimedOut:
+                self.logger.warning(
+                    f"Timeout sending to {chat_id}, retry {attempt+1}/3")
+                await asyncio.sleep(2 ** attempt)
+            except telegram.error.NetworkError:
+                self.logger.warning(
+                    f"Network error with {chat_id}, retry {attempt+1}/3")
+                await asyncio.sleep(2 ** attempt)
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to send to {chat_id}: {str(e)}")
+                break
+
+        self._record_delivery(chat_id, outcome, time.monotonic() - started)
+        return outcome, message
+
+    def _record_delivery(self, chat_id, outcome: str, elapsed: float):
+        """Per-recipient delivery counters and latency (EMA over sends)"""
+        stats = self.delivery_stats.setdefault(
+            chat_id, {"sent": 0, "failed": 0, "last_ms": 0.0, "avg_ms": 0.0})
+        first = stats["sent"] + stats["failed"] == 0
+        stats["sent" if outcome == "sent" else "failed"] += 1
+        stats["last_ms"] = round(elapsed * 1000, 1)
+        stats["avg_ms"] = stats["last_ms"] if first else round(0.8 * stats["avg_ms"] + 0.2 * stats["last_ms"], 1)
+
+    def stats(self) -> dict:
+        """
+        Delivery counters over all chats.
+
+        Chat IDs are stored encrypted, so they are never exposed here; only
+        totals and the latency spread across recipients are reported.
+        """
+        recipients = list(self.delivery_stats.values())
+        return {
+            "chats": len(self.chat_ids),
+            "sent": sum(stats["sent"] for stats in recipients),
+            "failed": sum(stats["failed"] for stats in recipients),
+            "avg_ms": round(sum(stats["avg_ms"] for stats in recipients) / len(recipients), 1) if recipients else 0.0,
+            "slowest_avg_ms": max((stats["avg_ms"] for stats in recipients), default=0.0),
+        }
 
     async def send_test_alert(self, test_image: Path):
         """Special method for test alerts"""
-        return await self.send_alert(test_image, "🔧 System Test: Service Operational")
+        results = await self.send_alert(test_image, "🔧 System Test: Service Operational")
+        return "sent" in results.values()
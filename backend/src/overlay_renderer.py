@@ -0,0 +1,108 @@
+import cv2
+import cvzone
+import numpy as np
+from typing import Tuple
+
+
+class OverlayRenderer:
+    """
+    Allocation-free drawing helpers for the detection overlay.
+
+    Translucent fills are blended only inside the box ROI against a
+    preallocated solid-colour buffer, and text/label sprites are rendered
+    once and pasted with a cached mask, so annotation cost scales with the
+    annotated area instead of with box count times frame size.
+    """
+
+    def __init__(self, max_cached_sprites: int = 256):
+        self.max_cached_sprites = max_cached_sprites
+        self._fill_buffers = {}
+        self._sprites = {}
+
+    def blend_box(self, frame: np.ndarray, box, color: Tuple[int, int, int], alpha: float = 0.2) -> None:
+        """Tint the inside of box with color at the given opacity, in place."""
+        height, width = frame.shape[:2]
+        x1, y1 = max(int(box[0]), 0), max(int(box[1]), 0)
+        x2, y2 = min(int(box[2]), width), min(int(box[3]), height)
+        if x1 >= x2 or y1 >= y2:
+            return
+
+        roi = frame[y1:y2, x1:x2]
+        fill = self._fill_buffer(color, height, width)[:y2 - y1, :x2 - x1]
+        cv2.addWeighted(fill, alpha, roi, 1 - alpha, 0, dst=roi)
+
+    def darken(self, frame: np.ndarray, top: int, alpha: float = 0.2) -> None:
+        """Scale every pixel from row top to the bottom of the frame by alpha, in place."""
+        strip = frame[top:]
+        cv2.convertScaleAbs(strip, dst=strip, alpha=alpha)
+
+    def draw_text(self, frame: np.ndarray, text: str, origin, font=cv2.FONT_HERSHEY_SIMPLEX,
+                  scale: float = 0.6, color=(255, 255, 255), thickness: int = 2) -> None:
+        """Equivalent of cv2.putText using a cached sprite."""
+        key = ('text', text, font, scale, color, thickness)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            (text_w, text_h), baseline = cv2.getTextSize(text, font, scale, thickness)
+            pad = thickness
+            canvas = np.zeros((text_h + baseline + 2 * pad, text_w + 2 * pad, 3), dtype=np.uint8)
+            mask = np.zeros(canvas.shape[:2], dtype=np.uint8)
+            cv2.putText(canvas, text, (pad, text_h + pad), font, scale, color, thickness)
+            cv2.putText(mask, text, (pad, text_h + pad), font, scale, 255, thickness)
+            sprite = self._cache(key, canvas, mask, (-pad, -text_h - pad))
+
+        self._paste(frame, sprite, origin)
+
+    def draw_label(self, frame: np.ndarray, text: str, origin, color_rect,
+                   scale: float = 1.5, thickness: int = 2, offset: int = 5, border: int = 2,
+                   color_text=(255, 255, 255), color_border=(0, 0, 0)) -> None:
+        """Equivalent of cvzone.putTextRect using a cached sprite."""
+        key = ('label', text, color_rect, scale, thickness, offset, border, color_text, color_border)
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            (text_w, text_h), _ = cv2.getTextSize(text, font, scale, thickness)
+            pad = offset + border
+            canvas = np.zeros((text_h + 2 * pad, text_w + 2 * pad, 3), dtype=np.uint8)
+            mask = np.zeros(canvas.shape[:2], dtype=np.uint8)
+            pos = (pad, text_h + pad)
+            cvzone.putTextRect(canvas, text, pos, scale=scale, thickness=thickness,
+                               colorR=color_rect, colorT=color_text, font=font,
+                               offset=offset, border=border, colorB=color_border)
+            cv2.rectangle(mask, (pad - offset, pad + text_h + offset), (pad + text_w + offset, pad - offset),
+                          255, cv2.FILLED)
+            cv2.rectangle(mask, (pad - offset, pad + text_h + offset), (pad + text_w + offset, pad - offset),
+                          255, border)
+            sprite = self._cache(key, canvas, mask, (-pad, -text_h - pad))
+
+        self._paste(frame, sprite, origin)
+
+    def _fill_buffer(self, color, height: int, width: int) -> np.ndarray:
+        buffer = self._fill_buffers.get(color)
+        if buffer is None or buffer.shape[0] < height or buffer.shape[1] < width:
+            buffer = np.empty((height, width, 3), dtype=np.uint8)
+            buffer[:] = color
+            self._fill_buffers[color] = buffer
+        return buffer
+
+    def _cache(self, key, canvas: np.ndarray, mask: np.ndarray, anchor):
+        if len(self._sprites) >= self.max_cached_sprites:
+            self._sprites.clear()
+        sprite = (canvas, (mask > 0)[..., None], anchor)
+        self._sprites[key] = sprite
+        return sprite
+
+    def _paste(self, frame: np.ndarray, sprite, origin) -> None:
+        canvas, mask, (anchor_x, anchor_y) = sprite
+        x, y = int(origin[0]) + anchor_x, int(origin[1]) + anchor_y
+        sprite_h, sprite_w = canvas.shape[:2]
+        height, width = frame.shape[:2]
+
+        # Clip the sprite to the frame
+        fx1, fy1 = max(x, 0), max(y, 0)
+        fx2, fy2 = min(x + sprite_w, width), min(y + sprite_h, height)
+        if fx1 >= fx2 or fy1 >= fy2:
+            return
+        sx1, sy1 = fx1 - x, fy1 - y
+        sx2, sy2 = sx1 + fx2 - fx1, sy1 + fy2 - fy1
+
+        np.copyto(frame[fy1:fy2, fx1:fx2], canvas[sy1:sy2, sx1:sx2], where=mask[sy1:sy2, sx1:sx2])
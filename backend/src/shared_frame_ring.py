@@ -0,0 +1,120 @@
+import json
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from typing import Optional, Tuple
+
+
+class SharedFrameRing:
+    """
+    Fixed-slot ring buffer of frames and small JSON results in shared memory.
+
+    One writer process copies each frame into the next slot; readers copy the
+    newest slot out. Every slot carries its own sequence number so a reader
+    can detect (and discard) a slot that was overwritten mid-copy.
+    """
+
+    # Per-slot header: sequence, height, width, channels, result length
+    META_FIELDS = 5
+
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        slots: int = 3,
+        max_frame_bytes: int = 1920 * 1080 * 3,
+        max_result_bytes: int = 4096,
+        create: bool = False
+        ):
+        """
+        Create or attach to a shared frame ring.
+
+        Args:
+            name (str): Shared memory segment name
+            slots (int): Number of frame slots in the ring
+            max_frame_bytes (int): Largest frame (h * w * c) a slot can hold
+            max_result_bytes (int): Largest JSON result a slot can hold
+            create (bool): True for the owning side, False to attach
+        """
+        self.slots = slots
+        self.max_frame_bytes = max_frame_bytes
+        self.max_result_bytes = max_result_bytes
+        self.created = create
+
+        slot_bytes = max_frame_bytes + max_result_bytes
+        header_bytes = 8 * (1 + slots * self.META_FIELDS)
+
+        if create:
+            self.shm = shared_memory.SharedMemory(
+                name=name, create=True, size=header_bytes + slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # Only the creator owns the segment; stop this side's tracker from unlinking it
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+
+        self.name = self.shm.name
+        self.header = np.ndarray((1 + slots * self.META_FIELDS,), dtype=np.int64, buffer=self.shm.buf)
+        self.meta = self.header[1:].reshape(slots, self.META_FIELDS)
+        self.data = np.ndarray((slots, slot_bytes), dtype=np.uint8,
+                               buffer=self.shm.buf, offset=header_bytes)
+        if create:
+            self.header[:] = 0
+
+    def write(self, frame: np.ndarray, result: dict) -> int:
+        """
+        Publish a frame and its detection result to the next slot.
+
+        Returns:
+            int: Sequence number of the written slot
+        """
+        payload = json.dumps(result).encode('utf-8')
+        if frame.nbytes > self.max_frame_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds ring slot size")
+        if len(payload) > self.max_result_bytes:
+            raise ValueError(f"Result of {len(payload)} bytes exceeds ring slot size")
+
+        sequence = int(self.header[0]) + 1
+        slot = sequence % self.slots
+        meta = self.meta[slot]
+        height, width = frame.shape[:2]
+        channels = frame.shape[2] if frame.ndim == 3 else 1
+
+        meta[0] = -1  # Mark slot as being written
+        self.data[slot, :frame.nbytes] = np.ascontiguousarray(frame).reshape(-1)
+        self.data[slot, self.max_frame_bytes:self.max_frame_bytes + len(payload)] = \
+            np.frombuffer(payload, dtype=np.uint8)
+        meta[1:] = (height, width, channels, len(payload))
+        meta[0] = sequence
+        self.header[0] = sequence
+        return sequence
+
+    def read_latest(self, last_sequence: int = 0) -> Tuple[int, Optional[np.ndarray], Optional[dict]]:
+        """
+        Copy out the newest slot if it is newer than last_sequence.
+
+        Returns:
+            tuple: (sequence, frame, result); frame and result are None when
+            nothing new is available or the slot was overwritten mid-copy
+        """
+        sequence = int(self.header[0])
+        if sequence == 0 or sequence == last_sequence:
+            return last_sequence, None, None
+
+        slot = sequence % self.slots
+        meta = self.meta[slot]
+        if meta[0] != sequence:
+            return last_sequence, None, None
+
+        height, width, channels, result_len = (int(v) for v in meta[1:])
+        shape = (height, width, channels) if channels > 1 else (height, width)
+        frame = self.data[slot, :height * width * channels].copy().reshape(shape)
+        payload = self.data[slot, self.max_frame_bytes:self.max_frame_bytes + result_len].tobytes()
+
+        if meta[0] != sequence:  # Torn read, writer lapped us
+            return last_sequence, None, None
+        return sequence, frame, json.loads(payload)
+
+    def close(self) -> None:
+        """Detach from the segment, unlinking it on the owning side."""
+        del self.header, self.meta, self.data
+        self.shm.close()
+        if self.created:
+            self.shm.unlink()
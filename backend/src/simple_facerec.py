@@ -2,85 +2,347 @@ import face_recognition
 import cv2
 import os
 import glob
+import json
+import time
 import numpy as np
+from .face_index import build_index
 
 class SimpleFacerec:
-    def __init__(self):
-        self.known_face_encodings = []
-        self.known_face_names = []
+    # Nama file index cache encoding (disimpan di cache_dir, bukan di folder gambar)
+    CACHE_INDEX = "index.json"
+
+    def __init__(self, cache_dir=None, index="exact", nprobe=8, detection_model="hog", upsample=1,
+                 frame_resizing=0.25, num_jitters=1, encoding_model="small", enroll_num_jitters=1):
+        # Jenis index pencarian: "exact" (brute-force) atau "ivf" (perkiraan, untuk galeri besar)
+        self.index_kind = index
+        self.nprobe = nprobe
+
+        # Folder cache encoding; None = selalu encode ulang semua gambar
+        self.cache_dir = cache_dir
+
+        # Galeri (index atas matrix float32 N x 128, nama per baris) sebagai satu snapshot
+        # yang diganti sekaligus, sehingga pengenalan yang berjalan tidak pernah melihat
+        # update setengah jadi. Satu nama boleh punya beberapa baris (beberapa foto)
+        self._gallery = None
+        self._gallery = self._build_gallery([])
+
+        # Satu entry per file gambar: file, mtime_ns, size, name, encoding (None = tidak ada wajah)
+        self._entries = []
 
         # Resize frame untuk pemrosesan lebih cepat
-        self.frame_resizing = 0.25
+        self.frame_resizing = frame_resizing
+
+        # Deteksi wajah: "hog" (CPU) atau "cnn" (lebih akurat, butuh GPU); upsample menemukan wajah kecil
+        self.detection_model = detection_model
+        self.upsample = upsample
+
+        # Encoding: jitter = sampling ulang per wajah (lebih stabil, lebih lambat),
+        # model "small" (5 titik) atau "large" (68 titik); galeri dan live harus sama
+        self.num_jitters = num_jitters
+        self.encoding_model = encoding_model
+        self.enroll_num_jitters = enroll_num_jitters
+
+        # Jarak maksimum agar wajah dianggap cocok (sama dengan default face_recognition)
+        self.tolerance = 0.6
+
+        self.images_path = None
+
+    @property
+    def known_face_encodings(self):
+        return self._gallery[0].matrix
+
+    @property
+    def known_face_names(self):
+        return self._gallery[1]
+
+    @property
+    def index(self):
+        return self._gallery[0]
+
+    @staticmethod
+    def image_paths(images_path):
+        """
+        Daftar gambar galeri: images/<Nama>.jpg (satu foto) dan
+        images/<Nama>/*.jpg (beberapa foto untuk satu orang)
+        """
+        return sorted(glob.glob(os.path.join(images_path, "*.*")) +
+                      glob.glob(os.path.join(images_path, "*", "*.*")))
 
     def load_encoding_images(self, images_path):
         """
         Memuat gambar-gambar dari path yang diberikan dan menyimpannya
+        Encoding diambil dari cache jika file gambar tidak berubah (path, mtime, ukuran),
+        hanya gambar baru atau yang berubah yang di-encode ulang
         :param images_path: Path ke folder gambar
         :return:
         """
-        # --- FIX: Bersihkan list yang ada sebelum memuat ulang ---
-        # Ini memastikan kita tidak duplikat saat fungsi ini dijalankan lagi
-        self.known_face_encodings = []
-        self.known_face_names = []
-        # --- AKHIR FIX ---
-        
         # Muat Gambar
-        images_path_list = glob.glob(os.path.join(images_path, "*.*"))
+        self.images_path = images_path
+        images_path_list = [path for path in self.image_paths(images_path) if os.path.isfile(path)]
 
         print("{} gambar encoding ditemukan.".format(len(images_path_list)))
 
+        cached = self._load_cache()
+        entries = []
+        encoded_count = 0
+
         # Simpan encoding gambar dan nama
         for img_path in images_path_list:
-            img = cv2.imread(img_path)
-            rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-            # Dapatkan nama file tanpa ekstensi
-            basename = os.path.basename(img_path)
-            (filename, ext) = os.path.splitext(basename)
-            
-            # Dapatkan encoding
-            # Asumsikan hanya ada satu wajah per gambar
-            try:
-                img_encoding = face_recognition.face_encodings(rgb_img)[0]
-            except IndexError as e:
-                print(f"Error: Tidak ada wajah terdeteksi di {filename}. Lewati gambar ini.")
-                continue
-
-            # Simpan nama file dan encodingnya
-            self.known_face_encodings.append(img_encoding)
-            self.known_face_names.append(filename)
-        
-        print("Encoding gambar berhasil dimuat")
+            entry = self._make_entry(img_path)
+            key = (entry["file"], entry["mtime_ns"], entry["size"])
+
+            if key in cached:
+                entry["encoding"] = cached[key]
+            else:
+                entry["encoding"] = self._encode_image(img_path, entry["name"])
+                encoded_count += 1
+
+            # Gambar tanpa wajah tetap dicatat agar tidak di-encode ulang
+            entries.append(entry)
+
+        # --- FIX: Ganti galeri sekaligus (bukan dikosongkan dulu) ---
+        # Ini memastikan kita tidak duplikat saat fungsi ini dijalankan lagi
+        self._publish(entries, save=encoded_count > 0 or len(cached) != len(entries))
+        # --- AKHIR FIX ---
+
+        print("Encoding gambar berhasil dimuat ({} baru, {} dari cache)".format(
+            encoded_count, len(entries) - encoded_count))
+
+    def add_person(self, img_path):
+        """
+        Tambah satu gambar tanpa memuat ulang seluruh galeri
+        Nama diambil dari nama file; gambar lain dengan nama yang sama tetap dipakai
+        Pemanggilan add/update/remove harus berurutan (tidak paralel), pengenalan boleh tetap berjalan
+        :param img_path: Path ke gambar yang sudah disimpan di folder gambar
+        :return: True jika wajah ditemukan di gambar
+        """
+        return self._enroll(img_path, keep_other_images=True)
+
+    def update_person(self, img_path):
+        """
+        Ganti semua gambar milik satu nama dengan gambar baru
+        :param img_path: Path ke gambar baru
+        :return: True jika wajah ditemukan di gambar
+        """
+        return self._enroll(img_path, keep_other_images=False)
+
+    def remove_person(self, name):
+        """
+        Hapus satu nama dari galeri (file gambarnya tidak dihapus)
+        :param name: Nama (nama file tanpa ekstensi)
+        :return: Daftar file gambar milik nama tersebut
+        """
+        removed = [e["file"] for e in self._entries if e["name"] == name]
+        if removed:
+            self._publish([e for e in self._entries if e["name"] != name])
+        return removed
+
+    def _enroll(self, img_path, keep_other_images):
+        # Encode di luar snapshot; galeri lama tetap dipakai sampai _publish
+        entry = self._make_entry(img_path)
+        entry["encoding"] = self._encode_image(img_path, entry["name"])
+
+        entries = [e for e in self._entries
+                   if e["file"] != entry["file"] and (keep_other_images or e["name"] != entry["name"])]
+        entries.append(entry)
+        self._publish(entries)
+        return entry["encoding"] is not None
+
+    def _make_entry(self, img_path):
+        # Path relatif terhadap folder gambar, misal "Budi.jpg" atau "Budi/2.jpg"
+        relative = os.path.relpath(img_path, self.images_path) if self.images_path else os.path.basename(img_path)
+        folder, basename = os.path.split(relative)
+        # Dapatkan nama file tanpa ekstensi (atau nama folder untuk beberapa foto)
+        (filename, ext) = os.path.splitext(basename)
+        stat = os.stat(img_path)
+        return {"file": relative.replace(os.sep, "/"), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                "name": folder or filename, "encoding": None}
+
+    def _build_gallery(self, encodings, names=()):
+        matrix = np.ascontiguousarray(np.array(encodings, dtype=np.float32).reshape(-1, 128))
+        # Index lama dipakai ulang (misal centroid IVF), jadi enrollment tidak melatih ulang index
+        previous = self._gallery[0] if self._gallery else None
+        index = build_index(self.index_kind, matrix, previous, state_dir=self.cache_dir, nprobe=self.nprobe)
+        return index, list(names)
+
+    def _publish(self, entries, save=True):
+        """Bangun galeri baru dari entries lalu ganti snapshot lama dalam satu assignment"""
+        known = [e for e in entries if e["encoding"] is not None]
+        self._entries = entries
+        self._gallery = self._build_gallery([e["encoding"] for e in known], [e["name"] for e in known])
+        if save:
+            self._save_cache(entries)
+
+    def _encode_image(self, img_path, filename):
+        """
+        Encode satu gambar
+        :return: Encoding 128-d, atau None jika tidak ada wajah
+        """
+        img = cv2.imread(img_path)
+        if img is None:
+            print(f"Error: {filename} bukan gambar yang valid. Lewati file ini.")
+            return None
+        rgb_img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+
+        # Dapatkan encoding
+        # Asumsikan hanya ada satu wajah per gambar
+        try:
+            return face_recognition.face_encodings(rgb_img, num_jitters=self.enroll_num_jitters,
+                                                   model=self.encoding_model)[0]
+        except IndexError as e:
+            print(f"Error: Tidak ada wajah terdeteksi di {filename}. Lewati gambar ini.")
+            return None
+
+    def _load_cache(self):
+        """
+        Baca cache encoding dari disk
+        :return: dict {(file, mtime_ns, size): encoding atau None}, kosong jika cache tidak ada/rusak
+        """
+        if not self.cache_dir:
+            return {}
+        index_path = os.path.join(self.cache_dir, self.CACHE_INDEX)
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            # Encoding dengan pengaturan lain tidak bisa dipakai ulang
+            if index.get("settings") != self._encoding_settings():
+                print("Pengaturan encoding berubah, encode ulang semua gambar")
+                return {}
+            # Memory-mapped: hanya baris yang dipakai yang dibaca dari disk
+            matrix = np.load(os.path.join(self.cache_dir, index["matrix"]), mmap_mode="r")
+            return {(entry["file"], entry["mtime_ns"], entry["size"]):
+                    None if entry["row"] is None else np.array(matrix[entry["row"]])
+                    for entry in index["entries"]}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"Cache encoding rusak, encode ulang semua gambar: {e}")
+            return {}
+
+    def _encoding_settings(self):
+        return {"num_jitters": self.enroll_num_jitters, "model": self.encoding_model}
+
+    def _save_cache(self, entries):
+        """
+        Tulis matrix encoding lalu index secara atomik (file sementara lalu rename)
+        Setiap versi matrix punya nama file sendiri, jadi index tidak pernah menunjuk
+        ke matrix yang setengah ditulis
+        """
+        if not self.cache_dir:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            rows = []
+            index_entries = []
+            for entry in entries:
+                row = None
+                if entry["encoding"] is not None:
+                    row = len(rows)
+                    rows.append(entry["encoding"])
+                index_entries.append({"file": entry["file"], "mtime_ns": entry["mtime_ns"],
+                                      "size": entry["size"], "name": entry["name"], "row": row})
+            matrix = np.array(rows, dtype=np.float32).reshape(-1, 128)
+            matrix_name = "encodings-{}.npy".format(time.time_ns())
+            np.save(os.path.join(self.cache_dir, matrix_name), matrix)
+
+            index_tmp = os.path.join(self.cache_dir, self.CACHE_INDEX + ".tmp")
+            with open(index_tmp, "w") as f:
+                json.dump({"matrix": matrix_name, "settings": self._encoding_settings(),
+                           "entries": index_entries}, f)
+            os.replace(index_tmp, os.path.join(self.cache_dir, self.CACHE_INDEX))
+
+            # Hapus matrix versi lama
+            for old_path in glob.glob(os.path.join(self.cache_dir, "encodings-*.npy")):
+                if os.path.basename(old_path) != matrix_name:
+                    os.remove(old_path)
+        except OSError as e:
+            print(f"Error: Gagal menyimpan cache encoding: {e}")
 
     def detect_known_faces(self, frame):
+        rgb_small_frame, face_locations = self.locate_faces(frame)
+        face_names = self.recognize_faces(rgb_small_frame, face_locations)
+
+        return self.scale_locations(face_locations), face_names
+
+    def locate_faces(self, frame):
+        """
+        Temukan lokasi wajah saja (tanpa encoding)
+        :param frame: Frame BGR ukuran asli
+        :return: (rgb_small_frame, face_locations) dalam skala kecil
+        """
         # Resize frame untuk pemrosesan lebih cepat
         small_frame = cv2.resize(frame, (0, 0), fx=self.frame_resizing, fy=self.frame_resizing)
         
         # Konversi gambar dari BGR (OpenCV) ke RGB (face_recognition)
         rgb_small_frame = cv2.cvtColor(small_frame, cv2.COLOR_BGR2RGB)
         
-        # Temukan semua lokasi wajah dan encoding wajah di frame saat ini
-        face_locations = face_recognition.face_locations(rgb_small_frame)
-        face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations)
-
-        face_names = []
-        for face_encoding in face_encodings:
-            # Cek apakah wajah cocok dengan wajah yang sudah diketahui
-            # tolerance=0.5 adalah nilai kuncinya
-            matches = face_recognition.compare_faces(self.known_face_encodings, face_encoding, tolerance=0.6)
-            name = "Unknown" # Nama default jika tidak ada kecocokan
-
-            # Gunakan wajah yang diketahui dengan jarak (distance) terkecil
-            face_distances = face_recognition.face_distance(self.known_face_encodings, face_encoding)
-            if len(face_distances) > 0:
-                best_match_index = np.argmin(face_distances)
-                if matches[best_match_index]:
-                    name = self.known_face_names[best_match_index]
-            
-            face_names.append(name)
+        # Temukan semua lokasi wajah di frame saat ini
+        face_locations = face_recognition.face_locations(rgb_small_frame, number_of_times_to_upsample=self.upsample,
+                                                         model=self.detection_model)
+        return rgb_small_frame, face_locations
+
+    def recognize_faces(self, rgb_small_frame, face_locations):
+        """
+        Hitung encoding dan cocokkan hanya untuk lokasi wajah yang diberikan
+        :param rgb_small_frame: Frame RGB skala kecil dari locate_faces
+        :param face_locations: Lokasi wajah skala kecil
+        :return: Daftar nama
+        """
+        if not face_locations:
+            return []
+        face_encodings = face_recognition.face_encodings(rgb_small_frame, face_locations,
+                                                         num_jitters=self.num_jitters, model=self.encoding_model)
+        return self.match_encodings(face_encodings)
+
+    def match_encodings(self, face_encodings):
+        """
+        Cocokkan semua encoding wajah dengan galeri dalam satu perhitungan (wajah x galeri)
+        :param face_encodings: Encoding 128-d dari face_recognition
+        :return: Daftar nama ("Unknown" jika tidak ada yang cukup dekat)
+        """
+        # Satu snapshot galeri untuk seluruh frame (bisa diganti oleh add/remove kapan saja)
+        index, known_face_names = self._gallery
+        if len(face_encodings) == 0:
+            return []
+        if not known_face_names:
+            return ["Unknown"] * len(face_encodings) # Nama default jika tidak ada kecocokan
+
+        # Gunakan wajah yang diketahui dengan jarak (distance) terkecil; untuk orang dengan
+        # beberapa foto, baris terdekat otomatis adalah foto terbaiknya
+        faces = np.asarray(face_encodings, dtype=np.float32).reshape(-1, 128)
+        best_match_index, best_distance = index.search(faces)
+        return [known_face_names[index] if distance <= self.tolerance ** 2 else "Unknown"
+                for index, distance in zip(best_match_index, best_distance)]
+
+    def auto_tune_resize(self, frame, target_fps, candidates=(0.25, 0.35, 0.5, 0.75, 1.0), repeats=3):
+        """
+        Pilih faktor resize terbesar yang masih memenuhi target FPS di hardware ini
+        :param frame: Contoh frame BGR dari kamera
+        :param target_fps: Target kecepatan pengenalan
+        :param candidates: Faktor resize yang dicoba, dari kecil ke besar
+        :return: Faktor resize yang dipilih (juga disimpan di frame_resizing)
+        """
+        budget = 1.0 / target_fps
+        chosen = candidates[0]
+        for factor in candidates:
+            self.frame_resizing = factor
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                self.detect_known_faces(frame)
+                timings.append(time.perf_counter() - start)
+            # Median, agar satu frame lambat tidak menentukan hasil
+            if sorted(timings)[len(timings) // 2] > budget:
+                break
+            chosen = factor
+
+        self.frame_resizing = chosen
+        print("Auto-tune resize: {} (target {} FPS)".format(chosen, target_fps))
+        return chosen
 
+    def scale_locations(self, face_locations):
         # Kembalikan koordinat ke ukuran frame asli
         face_locations = np.array(face_locations)
         face_locations = face_locations / self.frame_resizing
         
-        return face_locations.astype(int), face_names
\ No newline at end of file
+        return face_locations.astype(int)